@@ -0,0 +1,158 @@
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Sequence
+import csv
+import io
+
+from django.db import connection, transaction
+
+from .models import Franchise, Product
+
+STAGING_TABLE = "catalog_staging"
+
+# Columns of the staging table and the model field each one takes its type from
+STAGING_COLUMNS = (
+    ("isbn", Product, "isbn"),
+    ("type", Product, "type"),
+    ("title", Product, "title"),
+    ("description", Product, "description"),
+    ("image", Product, "image"),
+    ("link_to_provider", Product, "link_to_provider"),
+    ("release_date", Product, "release_date"),
+    ("content_hash", Product, "content_hash"),
+    ("franchise", Franchise, "title"),
+    # Id the franchise gets if it does not exist yet
+    ("franchise_id", Franchise, "id"),
+)
+
+# Product columns a load refreshes on products that are already stored
+UPDATE_COLUMNS = ("type", "title", "description", "image", "link_to_provider", "release_date", "content_hash", "updated_at")
+
+# Rows per executemany call where COPY is not available
+INSERT_BATCH_SIZE = 1000
+
+
+class _CopyStream:
+    """Read-only file object that renders rows as CSV for COPY FROM STDIN while it is read"""
+
+    def __init__(self, rows: Iterable[Sequence]):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        # Quoted, so empty strings are not read as NULL
+        self._writer = csv.writer(self._buffer, quoting=csv.QUOTE_ALL, lineterminator="\n")
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or self._buffer.tell() < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+        data = self._buffer.getvalue()
+        if size >= 0:
+            data, rest = data[:size], data[size:]
+        else:
+            rest = ""
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffer.write(rest)
+        return data
+
+
+def load_catalog(rows: Iterable[Sequence], publisher_id, updated_at: datetime) -> Counter:
+    """
+    Merge products into api_product and api_franchise with set-based SQL in one transaction.
+
+    The rows are loaded into a temporary staging table first, with COPY FROM STDIN on
+    PostgreSQL and batched executemany elsewhere. Missing franchises are then inserted
+    and products upserted with one statement each. Products whose content hash did not
+    change are left untouched.
+
+    Args:
+        rows: Tuples with the values of STAGING_COLUMNS, without duplicate ISBNs and with
+            the same franchise_id in every row of a franchise
+        publisher_id: Publisher the new products belong to
+        updated_at: Stored as the update time of new and changed products
+
+    Returns:
+        Counter of new, changed and unchanged products
+    """
+    quote = connection.ops.quote_name
+    staging = quote(STAGING_TABLE)
+    product_table = quote(Product._meta.db_table)
+    franchise_table = quote(Franchise._meta.db_table)
+    columns = [name for name, _, _ in STAGING_COLUMNS]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Temporary tables are private to the connection and skip the WAL on PostgreSQL
+        cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        definitions = ", ".join(
+            f"{quote(name)} {model._meta.get_field(field).db_type(connection)}"
+            for name, model, field in STAGING_COLUMNS
+        )
+        cursor.execute(f"CREATE TEMPORARY TABLE {staging} ({definitions})")
+        _fill_staging_table(cursor, staging, columns, rows)
+
+        cursor.execute(
+            f"SELECT COUNT(*), COUNT(p.isbn), "
+            f"SUM(CASE WHEN p.content_hash <> s.content_hash THEN 1 ELSE 0 END) "
+            f"FROM {staging} s LEFT JOIN {product_table} p ON p.isbn = s.isbn"
+        )
+        total, stored, changed = cursor.fetchone()
+        changed = changed or 0
+
+        # All rows of a franchise carry the same new id, so grouping by both yields one row per title.
+        # WHERE true keeps SQLite from reading ON CONFLICT as part of the SELECT
+        cursor.execute(
+            f"INSERT INTO {franchise_table} (id, title, description, image, is_followed, cover_source) "
+            f"SELECT s.franchise_id, s.franchise, '', '', %s, '' FROM {staging} s "
+            f"WHERE true GROUP BY s.franchise, s.franchise_id "
+            f"ON CONFLICT (title) DO NOTHING",
+            [False]
+        )
+        cursor.execute(
+            f"INSERT INTO {product_table} ("
+            f"isbn, type, title, description, image, link_to_provider, release_date, "
+            f"franchise_id, publisher_id, is_owned, cover_source, content_hash, updated_at) "
+            f"SELECT s.isbn, s.type, s.title, s.description, s.image, s.link_to_provider, s.release_date, "
+            f"f.id, %s, %s, '', s.content_hash, %s "
+            f"FROM {staging} s JOIN {franchise_table} f ON f.title = s.franchise WHERE true "
+            f"ON CONFLICT (isbn) DO UPDATE SET "
+            + ", ".join(f"{column} = excluded.{column}" for column in UPDATE_COLUMNS)
+            + f" WHERE {product_table}.content_hash <> excluded.content_hash",
+            [
+                Product._meta.get_field("publisher").get_db_prep_value(publisher_id, connection),
+                False,
+                connection.ops.adapt_datetimefield_value(updated_at),
+            ]
+        )
+        cursor.execute(f"DROP TABLE {staging}")
+
+    return Counter(new=total - stored, changed=changed, unchanged=stored - changed)
+
+
+def _fill_staging_table(cursor, staging: str, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    # Values are converted to their database representation by the field of their column
+    fields = [model._meta.get_field(field) for _, model, field in STAGING_COLUMNS]
+    rows = (
+        [field.get_db_prep_value(value, connection) for field, value in zip(fields, row)]
+        for row in rows
+    )
+
+    if connection.vendor == "postgresql":
+        copy_sql = f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        stream = _CopyStream(rows)
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(copy_sql, stream)
+        else:
+            # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                while chunk := stream.read(64 * 1024):
+                    copy.write(chunk)
+        cursor.execute(f"ANALYZE {staging}")
+        return
+
+    insert_sql = f"INSERT INTO {staging} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    while batch := list(islice(rows, INSERT_BATCH_SIZE)):
+        cursor.executemany(insert_sql, batch)
@@ -0,0 +1,58 @@
+from io import BytesIO
+from pathlib import Path
+import hashlib
+import re
+
+from django.conf import settings
+from PIL import Image
+
+from .models import CoverImage
+
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+THUMBNAIL_QUALITY = 80
+
+
+def cover_dir(digest: str) -> Path:
+    """Directory of a cover, fanned out by the first digest characters to keep directories small"""
+    return Path(settings.COVER_ROOT) / digest[:2] / digest
+
+
+def thumbnail_path(digest: str, size: str) -> Path:
+    return cover_dir(digest) / f"{size}.jpg"
+
+
+def store_cover(content: bytes) -> CoverImage:
+    """
+    Store a downloaded cover and its thumbnails, unless a cover with the same content exists
+
+    Args:
+        content: Image file as downloaded
+
+    Returns:
+        The CoverImage of the content
+
+    Raises:
+        PIL.UnidentifiedImageError: If the content is no image
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    cover = CoverImage.objects.filter(digest=digest).first()
+    if cover and all(thumbnail_path(digest, size).exists() for size in settings.COVER_THUMBNAIL_SIZES):
+        return cover
+
+    with Image.open(BytesIO(content)) as image:
+        image.load()
+        width, height = image.size
+        image = image.convert("RGB")
+
+        directory = cover_dir(digest)
+        directory.mkdir(parents=True, exist_ok=True)
+        for size, bounds in settings.COVER_THUMBNAIL_SIZES.items():
+            thumbnail = image.copy()
+            thumbnail.thumbnail(bounds, Image.LANCZOS)
+            # Written under a temporary name, so a served thumbnail is always complete
+            temporary = directory / f"{size}.jpg.tmp"
+            thumbnail.save(temporary, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+            temporary.replace(thumbnail_path(digest, size))
+
+    cover, _ = CoverImage.objects.get_or_create(digest=digest, defaults={"width": width, "height": height})
+    return cover
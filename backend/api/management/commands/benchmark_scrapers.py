@@ -0,0 +1,102 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from .scrapers.benchmark import benchmark_scraper, run_isolated
+from .scrapers.registry import load_scrapers
+from .scrapers.replay import FIXTURE_DIR
+from pathlib import Path
+import json
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the scrapers offline against recorded fixture archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--publishers',
+            nargs='+',
+            choices=list(load_scrapers()),
+            help='Publishers to benchmark (default: all with a recorded archive)',
+        )
+        parser.add_argument('--fixture-dir', type=Path, default=FIXTURE_DIR)
+        parser.add_argument('--engine', choices=['threads', 'asyncio'], default='threads')
+        parser.add_argument('--max-workers', type=int, default=5)
+        parser.add_argument('--parse-processes', type=int, default=0)
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every replayed response')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of replayed requests answered with 503')
+        parser.add_argument('--json', type=Path, help='Write the results to this file')
+        parser.add_argument(
+            '--baseline',
+            type=Path,
+            help='Results of an earlier run (--json) to compare against, failing on regressions',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Relative slowdown or memory growth accepted against the baseline',
+        )
+
+    def handle(self, *args, **options):
+        scrapers = load_scrapers()
+        fixture_dir = options['fixture_dir']
+        selected = options['publishers'] or [
+            name for name in scrapers if (fixture_dir / f'{name.lower()}.zip').exists()
+        ]
+        if not selected:
+            raise CommandError(f'No fixture archives found in {fixture_dir}, run record_scraper_fixtures first')
+
+        results = []
+        for name in selected:
+            archive_path = fixture_dir / f'{name.lower()}.zip'
+            if not archive_path.exists():
+                raise CommandError(f'Missing fixture archive {archive_path}')
+
+            # Each scraper runs in its own process so peak RSS is measured per scraper
+            result = run_isolated(
+                benchmark_scraper,
+                scrapers[name],
+                archive_path,
+                engine=options['engine'],
+                max_workers=options['max_workers'],
+                parse_processes=options['parse_processes'],
+                latency=options['latency'],
+                error_rate=options['error_rate'],
+            )
+            results.append(result)
+            self.stdout.write(
+                f'{name}: {result["pages_per_sec"]} pages/s, {result["parse_ms_per_page"]} ms parse/page '
+                f'(soup only {result["soup_parse_ms_per_page"]} ms), {result["parse_kb_per_page"]} KiB allocated/page '
+                f'(soup only {result["soup_parse_kb_per_page"]} KiB), {result["peak_rss_mb"]} MB peak RSS '
+                f'({result["requests"]} requests, {result["products"]} products in {result["seconds"]}s)'
+            )
+
+        if options['json']:
+            options['json'].write_text(json.dumps(results, indent=2))
+
+        if options['baseline']:
+            self.compare(results, json.loads(options['baseline'].read_text()), options['tolerance'])
+
+    def compare(self, results, baseline, tolerance):
+        """Raise CommandError if any scraper got slower or bigger than the baseline allows"""
+        baseline = {result['publisher']: result for result in baseline}
+        regressions = []
+        for result in results:
+            previous = baseline.get(result['publisher'])
+            if not previous:
+                continue
+            if result['pages_per_sec'] < previous['pages_per_sec'] * (1 - tolerance):
+                regressions.append(
+                    f'{result["publisher"]} throughput {result["pages_per_sec"]} < {previous["pages_per_sec"]} pages/s'
+                )
+            if result['parse_ms_per_page'] > previous['parse_ms_per_page'] * (1 + tolerance):
+                regressions.append(
+                    f'{result["publisher"]} parse time {result["parse_ms_per_page"]} > {previous["parse_ms_per_page"]} ms/page'
+                )
+            if result['peak_rss_mb'] > previous['peak_rss_mb'] * (1 + tolerance):
+                regressions.append(
+                    f'{result["publisher"]} peak RSS {result["peak_rss_mb"]} > {previous["peak_rss_mb"]} MB'
+                )
+
+        if regressions:
+            raise CommandError('Scraper benchmark regressed:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
@@ -1,12 +1,20 @@
-from django.core.management.base import BaseCommand
-from django.db import connection
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 
 class Command(BaseCommand):
     help = 'Removes all data from the database while preserving table structures'
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            'targets',
+            nargs='*',
+            metavar='app_label[.ModelName]',
+            help='Apps or models to clear (default: all). Rows referencing them are removed as well',
+        )
         # Add optional --preserve-superuser flag to command
         parser.add_argument(
             '--preserve-superuser',
@@ -14,41 +22,54 @@ class Command(BaseCommand):
             help='Preserve superuser accounts',
         )
 
+    @staticmethod
+    def selected_models(targets):
+        """Models of the given apps and models, all models if there are none"""
+        if not targets:
+            return apps.get_models(include_auto_created=True)
+
+        models = []
+        for target in targets:
+            try:
+                if '.' in target:
+                    models.append(apps.get_model(target))
+                else:
+                    models.extend(apps.get_app_config(target).get_models(include_auto_created=True))
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+        return models
+
     def handle(self, *args, **options):
         # Get preserve_superuser flag value from command options
         preserve_superuser = options['preserve_superuser']
-        
-        # Get all registered Django models
-        all_models = apps.get_models()
-        
-        with connection.cursor() as cursor:
-            # Temporarily disable foreign key constraints based on database type
-            if connection.vendor == 'mysql':
-                cursor.execute('SET FOREIGN_KEY_CHECKS = 0;')
-            elif connection.vendor == 'sqlite':
-                cursor.execute('PRAGMA foreign_keys = OFF;')
-            
-            try:
-                for model in all_models:
-                    model_name = model.__name__
-                    
-                    # Skip ContentType model as it's required by Django
-                    if model_name == 'ContentType':
-                        continue
-                    
-                    # Special handling for User model when preserve_superuser is True
-                    if preserve_superuser and model == get_user_model():
-                        self.stdout.write(f'Removing non-superuser accounts from {model_name}...')
-                        model.objects.filter(is_superuser=False).delete()
-                    else:
-                        self.stdout.write(f'Removing all data from {model_name}...')
-                        model.objects.all().delete()
-                    
-                self.stdout.write(self.style.SUCCESS('Successfully cleared all data from the database'))
-                
-            finally:
-                # Re-enable foreign key constraints
-                if connection.vendor == 'mysql':
-                    cursor.execute('SET FOREIGN_KEY_CHECKS = 1;')
-                elif connection.vendor == 'sqlite':
-                    cursor.execute('PRAGMA foreign_keys = ON;')
+        user_model = get_user_model()
+
+        tables = []
+        clear_users = False
+        for model in self.selected_models(options['targets']):
+            # Skip ContentType model as it's required by Django
+            if model is ContentType or model._meta.proxy or not model._meta.managed:
+                continue
+
+            # Special handling for User model when preserve_superuser is True
+            if preserve_superuser and model is user_model:
+                clear_users = True
+                continue
+
+            if model._meta.db_table not in tables:
+                self.stdout.write(f'Removing all data from {model.__name__}...')
+                tables.append(model._meta.db_table)
+
+        # One TRUNCATE ... RESTART IDENTITY CASCADE on PostgreSQL, the bulk equivalent
+        # of the backend elsewhere, instead of deleting and cascading object by object
+        statements = connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True)
+        with transaction.atomic():
+            if clear_users:
+                self.stdout.write(f'Removing non-superuser accounts from {user_model.__name__}...')
+                user_model.objects.filter(is_superuser=False).delete()
+            connection.ops.execute_sql_flush(statements)
+
+        if options['targets']:
+            self.stdout.write(self.style.SUCCESS(f'Successfully cleared {", ".join(options["targets"])}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Successfully cleared all data from the database'))
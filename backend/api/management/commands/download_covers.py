@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from api.covers import store_cover
+from api.models import CoverImage, Franchise, Product
+
+from .scrapers.base_scraper import BaseScraper
+from .scrapers.rate_limiter import get_bucket
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+
+class Command(BaseCommand):
+    help = 'Downloads product and franchise covers to the local cover store and generates their thumbnails'
+
+    # Covers larger than this are left hotlinked
+    MAX_COVER_BYTES = 10 * 1024 * 1024
+    CHUNK_BYTES = 64 * 1024
+
+    # Downloads submitted per worker ahead of the ones being stored, so finished covers do not pile up
+    QUEUED_PER_WORKER = 2
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-workers',
+            type=int,
+            default=8,
+            help='Number of covers downloaded at the same time',
+        )
+        parser.add_argument(
+            '--requests-per-second',
+            type=float,
+            default=2.0,
+            help='Allowed request rate per image host, 0 disables throttling (default: same as the publisher scrapers)',
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Download every cover again, not only new or changed image URLs',
+        )
+
+    @staticmethod
+    def pending_urls(refresh):
+        """Image URLs of products and franchises without an up to date local cover"""
+        urls = set()
+        for model in (Product, Franchise):
+            queryset = model.objects.filter(image__startswith='http')
+            if not refresh:
+                queryset = queryset.exclude(cover__isnull=False, cover_source=F('image'))
+            urls.update(queryset.values_list('image', flat=True).distinct())
+        return urls
+
+    def download(self, session, url, requests_per_second):
+        bucket = get_bucket(urlsplit(url).netloc, requests_per_second, 1) if requests_per_second else None
+        if bucket:
+            bucket.acquire()
+        # Streamed, so an oversized image is dropped after MAX_COVER_BYTES instead of read whole
+        with session.get(url, headers=BaseScraper.HEADERS, timeout=BaseScraper.REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            length = response.headers.get('Content-Length')
+            if length and length.isdigit() and int(length) > self.MAX_COVER_BYTES:
+                raise ValueError(f'{length} bytes exceed the cover size limit')
+            content = bytearray()
+            for chunk in response.iter_content(chunk_size=self.CHUNK_BYTES):
+                content += chunk
+                if len(content) > self.MAX_COVER_BYTES:
+                    raise ValueError(f'Cover exceeds the size limit of {self.MAX_COVER_BYTES} bytes')
+        return bytes(content)
+
+    def handle(self, *args, **options):
+        urls = self.pending_urls(options['refresh'])
+        self.stdout.write(f'Downloading {len(urls)} covers...')
+
+        session = BaseScraper._create_session()
+        known = set(CoverImage.objects.values_list('digest', flat=True))
+        stored = duplicates = failed = 0
+
+        # Downloads run in threads, hashing, thumbnails and database writes stay on this one
+        pending_urls = iter(urls)
+        window = options['max_workers'] * self.QUEUED_PER_WORKER
+        with ThreadPoolExecutor(max_workers=options['max_workers']) as executor:
+            futures = {}
+            while True:
+                for url in pending_urls:
+                    futures[executor.submit(self.download, session, url, options['requests_per_second'])] = url
+                    if len(futures) >= window:
+                        break
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = futures.pop(future)
+                    try:
+                        cover = store_cover(future.result())
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f'Cover {url} failed: {str(e)}')
+                        continue
+
+                    if cover.digest in known:
+                        duplicates += 1
+                    else:
+                        known.add(cover.digest)
+                        stored += 1
+                    for model in (Product, Franchise):
+                        model.objects.filter(image=url).update(cover=cover, cover_source=url)
+
+        self.stdout.write(
+            f'Covers: {stored} new, {duplicates} already stored, {failed} failed'
+        )
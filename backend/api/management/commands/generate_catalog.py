@@ -0,0 +1,235 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.constants import PRODUCT_TYPE
+from api.models import Product, Franchise, Publisher
+from datetime import date, timedelta
+import random
+import time
+import uuid
+
+# Release dates are drawn from a fixed range, so a seed yields the same catalog on any day
+FIRST_RELEASE = date(2000, 1, 1)
+LAST_RELEASE = date(2026, 12, 31)
+
+# Share of franchises per main type and chance of a volume belonging to another line, e.g. a light novel spin-off
+TYPE_WEIGHTS = {
+    PRODUCT_TYPE["MANGA"]: 0.7,
+    PRODUCT_TYPE["LIGHT_NOVEL"]: 0.15,
+    PRODUCT_TYPE["WEBTOON"]: 0.1,
+    PRODUCT_TYPE["OTHER"]: 0.05,
+}
+SPIN_OFF_CHANCE = 0.1
+
+PUBLISHER_NAMES = ['Sakura Verlag', 'Hikari Books', 'Kitsune Press', 'Tsuki Media', 'Yoru Comics', 'Kaze Editions']
+TITLE_WORDS = (
+    ['Silent', 'Crimson', 'Last', 'Hidden', 'Endless', 'Broken', 'Golden', 'Frozen', 'Wandering', 'Forgotten',
+     'Little', 'Eternal', 'Midnight', 'Shining', 'Lonely', 'Wild', 'Secret', 'Distant', 'Falling', 'Burning'],
+    ['Blade', 'Garden', 'Academy', 'Dragon', 'Witch', 'Kingdom', 'Summer', 'Heart', 'Hunter', 'Moon',
+     'Alchemist', 'Detective', 'Idol', 'Knight', 'Festival', 'Spirit', 'Melody', 'Labyrinth', 'Café', 'Star'],
+)
+DESCRIPTION_WORDS = (
+    'ein junges Mädchen Held Schule Geheimnis Abenteuer Freundschaft Liebe Kampf Welt Stadt Familie Traum '
+    'plötzlich entdeckt muss findet verliert gegen mit ohne neue alte dunkle magische Reise Vergangenheit'
+).split()
+
+
+class Command(BaseCommand):
+    help = 'Generates a synthetic catalog of configurable size for load testing, reproducible by its seed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--franchises', type=int, default=1000)
+        parser.add_argument('--products', type=int, default=200000)
+        parser.add_argument('--publishers', type=int, default=3)
+        parser.add_argument('--followed-ratio', type=float, default=0.1, help='Share of franchises that are followed')
+        parser.add_argument('--owned-ratio', type=float, default=0.2, help='Share of products that are owned')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per insert statement')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Remove the existing catalog first (clear_database api)',
+        )
+
+    def handle(self, *args, **options):
+        if options['publishers'] < 1 or options['franchises'] < 1:
+            raise CommandError('At least one publisher and one franchise are required')
+        if options['products'] < options['franchises']:
+            raise CommandError('Every franchise needs a product, --products must be at least --franchises')
+        for ratio in ('followed_ratio', 'owned_ratio'):
+            if not 0 <= options[ratio] <= 1:
+                raise CommandError(f'--{ratio.replace("_", "-")} must be between 0 and 1')
+
+        if options['clear']:
+            call_command('clear_database', 'api', stdout=self.stdout)
+        elif Product.objects.exists() or Franchise.objects.exists():
+            raise CommandError('The database already contains a catalog, pass --clear to replace it')
+
+        # A private generator, so nothing else drawing random numbers changes the catalog
+        rng = random.Random(options['seed'])
+        self.isbn_sequence = 0
+        started = time.monotonic()
+        with transaction.atomic():
+            publishers = self.generate_publishers(rng, options['publishers'])
+            franchises = self.generate_franchises(rng, publishers, options['franchises'], options['followed_ratio'])
+            self.stdout.write(f'Created {len(publishers)} publishers and {len(franchises)} franchises')
+            counts = self.products_per_franchise(rng, len(franchises), options['products'])
+            stats = self.generate_products(rng, franchises, counts, options['owned_ratio'], options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(franchises)} franchises ({stats["followed"]} followed) and '
+            f'{stats["products"]} products ({stats["owned"]} owned) in {time.monotonic() - started:.1f}s'
+        ))
+
+    @staticmethod
+    def uuid(rng):
+        """Version 4 UUID drawn from the seeded generator instead of the OS"""
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def generate_publishers(self, rng, count):
+        publishers = []
+        for index in range(count):
+            name = PUBLISHER_NAMES[index % len(PUBLISHER_NAMES)]
+            if index >= len(PUBLISHER_NAMES):
+                name += f' {index // len(PUBLISHER_NAMES) + 1}'
+            slug = name.lower().replace(' ', '-')
+            publishers.append(Publisher(
+                id=self.uuid(rng),
+                name=name,
+                website=f'https://{slug}.example.com',
+                image=f'https://{slug}.example.com/logo.png',
+            ))
+        return Publisher.objects.bulk_create(publishers)
+
+    def generate_franchises(self, rng, publishers, count, followed_ratio):
+        """
+        Insert franchises with unique titles, each published by one publisher
+
+        Returns:
+            List of (franchise, publisher, main type) tuples
+        """
+        # A few publishers hold most of the catalog
+        publisher_weights = [1 / (rank + 1) for rank in range(len(publishers))]
+        types, type_weights = zip(*TYPE_WEIGHTS.items())
+
+        franchises = []
+        titles = set()
+        for _ in range(count):
+            title = f'{rng.choice(TITLE_WORDS[0])} {rng.choice(TITLE_WORDS[1])}'
+            if title in titles:
+                title = f'{title} {len(titles) + 1}'
+            titles.add(title)
+            franchise = Franchise(
+                id=self.uuid(rng),
+                title=title,
+                description=self.description(rng),
+                image=f'https://covers.example.com/franchise/{len(titles)}.jpg',
+                is_followed=rng.random() < followed_ratio,
+            )
+            publisher = rng.choices(publishers, publisher_weights)[0]
+            franchises.append((franchise, publisher, rng.choices(types, type_weights)[0]))
+
+        Franchise.objects.bulk_create([franchise for franchise, _, _ in franchises])
+        return franchises
+
+    @staticmethod
+    def products_per_franchise(rng, franchises, products):
+        """
+        Split the products over the franchises by log-normal weights, most series are short
+        and a few run for a long time. Every franchise gets at least one product.
+        """
+        weights = [rng.lognormvariate(0, 1) for _ in range(franchises)]
+        extra = products - franchises
+        total = sum(weights)
+        shares = [extra * weight / total for weight in weights]
+        counts = [1 + int(share) for share in shares]
+        # Hand out what rounding down left over to the largest remainders
+        remainder = products - sum(counts)
+        for index in sorted(range(franchises), key=lambda i: shares[i] - int(shares[i]), reverse=True)[:remainder]:
+            counts[index] += 1
+        return counts
+
+    def generate_products(self, rng, franchises, counts, owned_ratio, batch_size):
+        """
+        Insert the volumes of every franchise in batches, without holding the whole catalog in memory
+
+        Followed franchises are collected from the first volume on, up to a random later volume.
+        The rest of the owned products is spread evenly over the other franchises, so that the
+        share of owned products matches owned_ratio unless the followed franchises exceed it.
+        """
+        collected = [
+            round(count * rng.uniform(0.5, 1.0)) if franchise.is_followed else 0
+            for (franchise, _, _), count in zip(franchises, counts)
+        ]
+        # Selection sampling picks exactly the missing number of owned products in one pass
+        to_pick = max(0, round(owned_ratio * sum(counts)) - sum(collected))
+        candidates = sum(count for (franchise, _, _), count in zip(franchises, counts) if not franchise.is_followed)
+
+        updated_at = timezone.now()
+        stats = {'products': 0, 'owned': 0, 'followed': 0}
+        batch = []
+        for (franchise, publisher, main_type), count, owned_volumes in zip(franchises, counts, collected):
+            stats['followed'] += franchise.is_followed
+            spin_off_type = rng.choice([product_type for product_type in TYPE_WEIGHTS if product_type != main_type])
+
+            # Volumes follow each other at a steady pace, squeezed for series too long for the date range
+            days = (LAST_RELEASE - FIRST_RELEASE).days
+            interval = min(max(14.0, rng.gauss(90, 30)), days / count)
+            release = FIRST_RELEASE + timedelta(days=rng.uniform(0, days - interval * (count - 1)))
+
+            volumes = {}
+            for index in range(count):
+                product_type = spin_off_type if rng.random() < SPIN_OFF_CHANCE else main_type
+                volumes[product_type] = volumes.get(product_type, 0) + 1
+                if franchise.is_followed:
+                    is_owned = index < owned_volumes
+                else:
+                    is_owned = rng.random() * candidates < to_pick
+                    candidates -= 1
+                    to_pick -= is_owned
+
+                batch.append(self.product(
+                    rng, franchise, publisher, product_type, volumes[product_type],
+                    release + timedelta(days=interval * index), is_owned, updated_at,
+                ))
+                stats['owned'] += is_owned
+                if len(batch) >= batch_size:
+                    self.insert(batch, stats, sum(counts))
+                    batch = []
+
+        if batch:
+            self.insert(batch, stats, sum(counts))
+        return stats
+
+    def insert(self, batch, stats, total):
+        Product.objects.bulk_create(batch, batch_size=len(batch))
+        stats['products'] += len(batch)
+        self.stdout.write(f'Inserted {stats["products"]}/{total} products')
+
+    @staticmethod
+    def description(rng):
+        return ' '.join(rng.choices(DESCRIPTION_WORDS, k=rng.randint(15, 60))).capitalize()[:500]
+
+    def product(self, rng, franchise, publisher, product_type, volume, release_date, is_owned, updated_at):
+        # Synthetic but well-formed ISBN-13 (978-3-dddd-dddd-c), unique per generated product
+        self.isbn_sequence += 1
+        digits = f'9783{self.isbn_sequence:08d}'
+        check = (10 - sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(digits)) % 10) % 10
+        isbn = f'978-3-{digits[4:8]}-{digits[8:]}-{check}'
+
+        line = '' if product_type == PRODUCT_TYPE['MANGA'] else f' {product_type.replace("_", " ").title()}'
+        return Product(
+            isbn=isbn,
+            type=product_type,
+            title=f'{franchise.title}{line}, Band {volume:02d}'[:100],
+            description=self.description(rng),
+            image=f'https://covers.example.com/product/{isbn}.jpg',
+            link_to_provider=f'{publisher.website}/{isbn}',
+            release_date=release_date,
+            franchise=franchise,
+            publisher=publisher,
+            is_owned=is_owned,
+            updated_at=updated_at,
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.models import Franchise, Product
+
+
+class Command(BaseCommand):
+    help = (
+        'Merges franchises sharing a title into one, so the unique constraint on Franchise.title '
+        'can be applied. Run before migrate, the entrypoint does so on every start'
+    )
+
+    def handle(self, *args, **options):
+        franchise_table = Franchise._meta.db_table
+        product_table = Product._meta.db_table
+        if franchise_table not in connection.introspection.table_names():
+            return
+
+        merged = 0
+        # Plain SQL on the id, title and is_followed columns only, as the table may predate other model fields
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"SELECT title FROM {franchise_table} GROUP BY title HAVING COUNT(*) > 1")
+            for title, in cursor.fetchall():
+                # The followed franchise with the most products is kept
+                cursor.execute(
+                    f"SELECT f.id FROM {franchise_table} f WHERE f.title = %s "
+                    f"ORDER BY f.is_followed DESC, "
+                    f"(SELECT COUNT(*) FROM {product_table} p WHERE p.franchise_id = f.id) DESC, f.id",
+                    [title]
+                )
+                keeper, *duplicates = [franchise_id for franchise_id, in cursor.fetchall()]
+                placeholders = ', '.join(['%s'] * len(duplicates))
+                cursor.execute(
+                    f"UPDATE {product_table} SET franchise_id = %s WHERE franchise_id IN ({placeholders})",
+                    [keeper, *duplicates]
+                )
+                cursor.execute(f"DELETE FROM {franchise_table} WHERE id IN ({placeholders})", duplicates)
+                merged += len(duplicates)
+                self.stdout.write(f'Merged {len(duplicates)} duplicates of franchise {title}')
+
+        if merged:
+            self.stdout.write(self.style.SUCCESS(f'Merged {merged} duplicate franchises'))
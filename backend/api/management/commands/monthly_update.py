@@ -1,131 +1,292 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from django.utils import timezone
+from api.catalog_load import load_catalog
 from api.models import Product, Franchise, Publisher
 from api.constants import PRODUCT_TYPE
 
-from .scrapers.altraverse import AltraverseScraper
-from .scrapers.tokyopop import TokyopopScraper
 from .scrapers.base_scraper import BaseScraper
-from datetime import datetime
+from .scrapers.registry import load_scrapers
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+import hashlib
 import re
+import uuid
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items from any iterable without reading ahead further"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
 
 class Command(BaseCommand):
     help = 'Updates the database with new manga and light novel releases'
 
-    def writeToDatabase(self, products, publisher):
-        for franchise_name, items in products.items():
-            # Get or create franchise
-            franchise, _ = Franchise.objects.get_or_create(
-                title=franchise_name,
-                defaults={}
+    # Products written per transaction while the scrapers keep running
+    BATCH_SIZE = 100
+
+    # Product fields a scrape refreshes on products that are already stored
+    UPDATE_FIELDS = ('title', 'description', 'image', 'link_to_provider', 'release_date', 'type')
+
+    def writeToDatabase(self, products, publisher, on_batch_written=None):
+        """
+        Store scraped products as they arrive
+
+        Args:
+            products: Iterable of ProductInfo, typically a running scraper's iter_products()
+            publisher: Publisher the products belong to
+            on_batch_written: Called with every batch once its transaction is committed
+
+        Returns:
+            Counter of new, changed and unchanged products
+        """
+        counts = Counter()
+        for batch in batched(products, self.BATCH_SIZE):
+            with transaction.atomic():
+                counts.update(self.write_batch(batch, publisher))
+            if on_batch_written:
+                on_batch_written(batch)
+        return counts
+
+    def valid_items(self, batch):
+        """Items of a batch that can be stored, the last one wins if an ISBN occurs twice"""
+        items = {}
+        for item in batch:
+            # Skip items with invalid ISBNs
+            if not BaseScraper.is_valid_isbn(item.isbn):
+                self.stdout.write(f'Skipping item with invalid ISBN: {item.isbn}')
+                continue
+
+            if not item.release_date:
+                self.stdout.write(f'Skipping item without release date: {item.isbn}')
+                continue
+
+            items[item.isbn] = item
+        return list(items.values())
+
+    @staticmethod
+    def resolve_franchises(titles):
+        """Look up the franchises with the given titles in one query, creating the missing ones in one insert"""
+        franchises = {franchise.title: franchise for franchise in Franchise.objects.filter(title__in=titles)}
+        missing = [title for title in titles if title not in franchises]
+        if missing:
+            # Another publisher may insert the same franchise meanwhile, the row that got in first is used
+            Franchise.objects.bulk_create([Franchise(title=title) for title in missing], ignore_conflicts=True)
+            franchises.update(
+                (franchise.title, franchise) for franchise in Franchise.objects.filter(title__in=missing)
+            )
+        return franchises
+
+    @staticmethod
+    def content_hash(values):
+        """Fingerprint of the scraped fields of a product, given in UPDATE_FIELDS order"""
+        content = '\x1f'.join(str(value) for value in values)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def write_batch(self, batch, publisher):
+        """
+        Upsert a batch of products with a single INSERT ... ON CONFLICT, skipping the ones
+        whose content fingerprint did not change
+
+        Returns:
+            Counter of new, changed and unchanged products
+        """
+        items = self.valid_items(batch)
+        franchises = self.resolve_franchises({item.franchise for item in items})
+        stored = dict(
+            Product.objects.filter(isbn__in=[item.isbn for item in items]).values_list('isbn', 'content_hash')
+        )
+
+        counts = Counter()
+        changed = []
+        now = timezone.now()
+        for item in items:
+            product = Product(
+                isbn=item.isbn,
+                title=item.title,
+                franchise=franchises[item.franchise],
+                description=item.description,
+                image=item.image_url,
+                link_to_provider=item.url,
+                release_date=item.release_date,
+                type=PRODUCT_TYPE[item.product_type or 'MANGA'],
+                publisher=publisher,
+                updated_at=now,
+            )
+            product.content_hash = self.content_hash(getattr(product, field) for field in self.UPDATE_FIELDS)
+            if item.isbn not in stored:
+                action, outcome = 'Created', 'new'
+            elif stored[item.isbn] != product.content_hash:
+                action, outcome = 'Updated', 'changed'
+            else:
+                counts['unchanged'] += 1
+                continue
+
+            counts[outcome] += 1
+            changed.append(product)
+            self.stdout.write(
+                f'{action} product: {product.title} (ISBN: {product.isbn})'
             )
 
-            for item in items:
-                # Skip items with invalid ISBNs
-                if not item.get('isbn') or not BaseScraper.is_valid_isbn(item['isbn']):
-                    self.stdout.write(
-                        f'Skipping item with invalid ISBN: {item.get("isbn")}')
-                    continue
-
-                # Convert release date string to datetime
-                release_date = None
-                if item.get('release_date') and item['release_date'] != 'N/A':
-                    try:
-                        release_date = datetime.strptime(
-                            item['release_date'],
-                            '%d.%m.%Y'
-                        ).date()
-                    except ValueError:
-                        self.stdout.write(
-                            f'Invalid release date format: {item["release_date"]}'
-                        )
-
-                # Get or create product
-                product, created = Product.objects.get_or_create(
-                    isbn=item['isbn'],
-                    defaults={
-                        'title': item['title'],
-                        'franchise': franchise,
-                        'description': item.get('description', ''),
-                        'image': item.get('image', ''),
-                        'link_to_provider': item.get('link', ''),
-                        'release_date': release_date,
-                        'type': PRODUCT_TYPE[item.get('type', 'MANGA')],
-                        'publisher': publisher,
-                    }
-                )
-
-                if not created:
-                    # Update existing product
-                    product.title = item['title']
-                    product.description = item.get('description', '')
-                    product.image = item.get('image', '')
-                    product.link_to_provider = item.get('link', '')
-                    product.release_date = release_date
-                    product.type = PRODUCT_TYPE[item.get('type', 'MANGA')]
-                    product.save()
-
-                action = 'Created' if created else 'Updated'
-                self.stdout.write(
-                    f'{action} product: {product.title} (ISBN: {product.isbn})'
-                )
+        # Products stored by a concurrent run in the meantime are updated instead of failing the batch
+        Product.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['isbn'],
+            update_fields=[*self.UPDATE_FIELDS, 'content_hash', 'updated_at'],
+        )
+        return counts
+
+    def bulk_load(self, products, publisher):
+        """
+        Store all products of a publisher in one transaction through a staging table
+
+        Returns:
+            Counter of new, changed and unchanged products
+        """
+        franchise_ids = {}
+        rows = []
+        for item in self.valid_items(products):
+            product_type = PRODUCT_TYPE[item.product_type or 'MANGA']
+            values = (item.title, item.description, item.image_url, item.url, item.release_date, product_type)
+            rows.append((
+                item.isbn, product_type, item.title, item.description, item.image_url, item.url,
+                item.release_date, self.content_hash(values),
+                item.franchise, franchise_ids.setdefault(item.franchise, uuid.uuid4()),
+            ))
+        return load_catalog(rows, publisher.id, timezone.now())
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only fetch product pages of new or stale ISBNs and stop at the first listing page without new products',
+        )
+        parser.add_argument(
+            '--publishers',
+            nargs='+',
+            choices=list(load_scrapers()),
+            help='Publishers to update (default: all registered scrapers)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=0,
+            help='Number of publishers scraped at the same time (default: all selected publishers)',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=None,
+            help='Seconds after which the scrape of a single publisher is stopped',
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            default=None,
+            help='Number of listing pages to scrape per publisher (default: all pages the listing states)',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue the interrupted previous run from its crawl frontier instead of starting over',
+        )
+        parser.add_argument(
+            '--sitemap',
+            action='store_true',
+            help='Discover products from the shop sitemaps instead of the listing pages. '
+                 'With --incremental only products modified since the last complete sitemap run are fetched',
+        )
+        parser.add_argument(
+            '--bulk-load',
+            action='store_true',
+            help='Collect all products of a publisher and load them in one transaction through a staging table '
+                 '(COPY on PostgreSQL). Meant for first loads of a full catalog, nothing is stored before the scrape ends',
+        )
+        parser.add_argument(
+            '--skip-covers',
+            action='store_true',
+            help='Do not download the covers of new and changed products after scraping',
+        )
+
+    @staticmethod
+    def existing_isbns(isbns):
+        """Return the given ISBNs that are already stored, in a single query"""
+        return set(Product.objects.filter(isbn__in=isbns).values_list('isbn', flat=True))
+
+    def update_publisher(self, scraper_cls, incremental, timeout, resume=False, sitemap=False, bulk_load=False,
+                         max_pages=None):
+        """Scrape one publisher and write its products while the scrape is running, or all at once with bulk_load"""
+        try:
+            publisher = Publisher.objects.get_or_create(name=scraper_cls.PUBLISHER)[0]
+            scraper = scraper_cls()
+            products = scraper.iter_products(
+                max_pages=max_pages,
+                incremental=incremental,
+                known_isbns=self.existing_isbns,
+                timeout=timeout,
+                resume=resume,
+                sitemap=sitemap
+            )
+            if bulk_load:
+                products = list(products)
+                counts = self.bulk_load(products, publisher)
+                scraper.checkpoint(products)
+            else:
+                # Products only count as done in the crawl frontier once they are committed
+                counts = self.writeToDatabase(products, publisher, on_batch_written=scraper.checkpoint)
+            self.stdout.write(
+                f'{publisher.name}: {counts["new"]} new, {counts["changed"]} changed, {counts["unchanged"]} unchanged'
+            )
+        finally:
+            # Each publisher runs in its own thread and therefore its own connection
+            connection.close()
 
     def handle(self, *args, **options):
         self.stdout.write('Starting monthly update...')
 
-        # Initialize scrapers
-        #altraverse_scraper = AltraverseScraper(max_workers=1, rate_limit=1.0)
-        #tokyopop_scraper = TokyopopScraper(max_workers=1, rate_limit=1.0)
-
-        # Get products from both publishers
-        #self.stdout.write('Scraping Altraverse products...')
-        #altraverse_products = altraverse_scraper.scrape_products()
-
-        #self.stdout.write('Scraping Tokyopop products...')
-        #tokyopop_products = tokyopop_scraper.scrape_products()
-
-        # Process and store products
-        publishers = {
-            #'Altraverse': (altraverse_products, Publisher.objects.get_or_create(name='Altraverse')[0]),
-            #'Tokyopop': (tokyopop_products, Publisher.objects.get_or_create(name='Tokyopop')[0])
-            'Test': ({
-                'ShangriLaFrontier': [
-                    {
-                        'isbn': '978-3-7539-3206-4',
-                        'title': 'ShangriLaFrontier, Band 19',
-                        'description': 'Die vier Siegelgeneräle sind besiegt und der Weg damit frei. Nun gilt es für Sunraku und seine Freunde, den nächsten der Stärksten Sieben, Kthanid aus dem Abgrund, herauszufordern. Doch wie wollen sie gegen seine Kraft, die alles umkehren kann, ankommen?',
-                        'image': 'https://altraverse.de/media/image/0d/96/fb/meine-wiedergeburt-als-schleim-27-cover_400x400.jpg',
-                        'release_date': '17.03.2025',
-                        'type': 'MANGA',
-                        'link': 'https://altraverse.de/manga/shangri-la-frontier/2033/shangrilafrontier-band-19'
-                    }
-                ],
-                'Meine Wiedergeburt als Schleim in einer anderen Welt': [
-                    {
-                        'isbn': '978-3-7539-3187-6',
-                        'title': 'Meine Wiedergeburt als Schleim in einer anderen Welt, Band 27', 
-                        'description': 'Das Gründungsfest von Tempest war ein voller Erfolg und hat alle Gäste begeistert. Doch die Händler müssen noch bezahlt werden und sie wurden von irgendwem dazu angestachelt, nur noch die Münzen des Zwergenreichs zu akzeptieren. Rimuru will die Chance nutzen und den Spieß umdrehen, um so die Hintermänner der Intrige zu entlarven.',
-                        'image': 'https://altraverse.de/media/image/12/c9/5c/meine-wiedergeburt-als-schleim-27-CE-cover_400x400.jpg',
-                        'release_date': '17.03.2025',
-                        'type': 'MANGA',
-                        'link': 'https://altraverse.de/manga/meine-wiedergeburt-als-schleim-in-einer-anderen-welt/2022/meine-wiedergeburt-als-schleim-in-einer-anderen-welt-band-27'
-                    },
-                    {
-                        'isbn': '978-3-7539-3184-5',
-                        'title': 'Meine Wiedergeburt als Schleim in einer anderen Welt – Kleimans Rache, Band 05', 
-                        'description': 'Nach seinem Besuch der Auktion ist Kleiman gerüstet mit Tränken, von denen er sich erhofft, sie könnten den Energieverbrauch der Namensgebungen ausgleichen. Dazu hat er sich nun in den Kopf gesetzt, selbst magische Werkzeuge herzustellen …',
-                        'image': 'https://altraverse.de/media/image/19/b9/f0/das-leben-im-land-der-daemonen-03-cover_400x400.jpg',
-                        'release_date': '17.03.2025',
-                        'type': 'MANGA',
-                        'link': 'https://altraverse.de/manga/meine-wiedergeburt-als-schleim-in-einer-anderen-welt/2025/meine-wiedergeburt-als-schleim-in-einer-anderen-welt-kleimans-rache-band-05'
-                    }
-                ]
-            }, Publisher.objects.get_or_create(name='Test')[0])
-        }
-
-        for publisher_name, (products, publisher) in publishers.items():
-            self.stdout.write(f'Processing {publisher_name} products...')
-            self.writeToDatabase(products, publisher)
-
-        self.stdout.write('Monthly update completed successfully!')
+        incremental = options['incremental']
+        if incremental:
+            self.stdout.write('Incremental mode: skipping products that are already stored')
+        if options['resume']:
+            self.stdout.write('Resuming the previous run')
+
+        scrapers = load_scrapers()
+        selected = options['publishers'] or list(scrapers)
+        concurrency = options['concurrency'] or len(selected)
+
+        # Publishers are scraped side by side, each throttled by its own per-host rate limit
+        failed = []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {
+                executor.submit(
+                    self.update_publisher,
+                    scrapers[name], incremental, options['timeout'], options['resume'], options['sitemap'],
+                    options['bulk_load'], options['max_pages']
+                ): name
+                for name in selected
+            }
+            for future in as_completed(futures):
+                publisher_name = futures[future]
+                try:
+                    future.result()
+                    self.stdout.write(f'Finished {publisher_name} products')
+                except Exception as e:
+                    failed.append(publisher_name)
+                    self.stderr.write(f'Updating {publisher_name} failed: {str(e)}')
+
+        if not options['skip_covers']:
+            # Covers are fetched in bulk once every publisher is written, instead of per product
+            try:
+                call_command('download_covers', stdout=self.stdout, stderr=self.stderr)
+            except Exception as e:
+                self.stderr.write(f'Downloading covers failed: {str(e)}')
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f'Monthly update completed, failed publishers: {", ".join(failed)}'))
+        else:
+            self.stdout.write('Monthly update completed successfully!')
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from .scrapers.registry import load_scrapers
+from .scrapers.replay import FIXTURE_DIR, FixtureArchive
+from pathlib import Path
+import tempfile
+
+
+class Command(BaseCommand):
+    help = 'Records live publisher pages into fixture archives for offline replay and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--publishers',
+            nargs='+',
+            choices=list(load_scrapers()),
+            help='Publishers to record (default: all registered scrapers)',
+        )
+        parser.add_argument(
+            '--max-pages',
+            type=int,
+            default=2,
+            help='Number of listing pages to record per publisher',
+        )
+        parser.add_argument(
+            '--fixture-dir',
+            type=Path,
+            default=FIXTURE_DIR,
+            help='Directory the <publisher>.zip archives are written to',
+        )
+
+    def handle(self, *args, **options):
+        scrapers = load_scrapers()
+        for name in options['publishers'] or list(scrapers):
+            scraper_cls = scrapers[name]
+            self.stdout.write(f'Recording {name}...')
+
+            with tempfile.TemporaryDirectory() as cache_dir:
+                # A throwaway crawl state, so recording neither resets the frontier of the real
+                # scrapes nor touches their URL index and metrics
+                recording_cls = type(scraper_cls.__name__, (scraper_cls,), {'CACHE_DIR': Path(cache_dir)})
+                # Bypass the HTTP cache so the archive holds what the site serves today
+                scraper = recording_cls(use_cache=False)
+                scraper.recorder = FixtureArchive(scraper.BASE_URL)
+                products = sum(1 for _ in scraper.iter_products(max_pages=options['max_pages']))
+
+            path = options['fixture_dir'] / f'{name.lower()}.zip'
+            scraper.recorder.save(path)
+            self.stdout.write(self.style.SUCCESS(
+                f'Recorded {len(scraper.recorder)} pages ({products} products) to {path}'
+            ))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from .scrapers.base_scraper import BaseScraper
+from .scrapers.metrics import format_summary, load_summaries
+from .scrapers.registry import load_scrapers
+from datetime import datetime
+from pathlib import Path
+import json
+
+
+class Command(BaseCommand):
+    help = 'Shows the metrics the scrapers saved for their last runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--publishers',
+            nargs='+',
+            choices=list(load_scrapers()),
+            help='Publishers to show (default: all)',
+        )
+        parser.add_argument('--last', type=int, default=10, help='Number of most recent runs to show')
+        parser.add_argument('--metrics-dir', type=Path, default=BaseScraper.CACHE_DIR / 'metrics')
+        parser.add_argument('--json', action='store_true', help='Print the full summaries as JSON')
+
+    def handle(self, *args, **options):
+        if not options['metrics_dir'].is_dir():
+            raise CommandError(f'No scrape metrics found in {options["metrics_dir"]}')
+
+        summaries = []
+        for publisher in options['publishers'] or [None]:
+            summaries.extend(load_summaries(options['metrics_dir'], publisher))
+        summaries.sort(key=lambda summary: summary['started_at'])
+        summaries = summaries[-options['last']:] if options['last'] > 0 else []
+
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, indent=2))
+            return
+
+        for summary in summaries:
+            started = datetime.fromtimestamp(summary['started_at']).strftime('%Y-%m-%d %H:%M')
+            self.stdout.write(f'{started} {format_summary(summary)}')
+            for host, metrics in summary['hosts'].items():
+                if not metrics['requests']:
+                    self.stdout.write(f'  {host}: {metrics["cache_hits"]} cache hits')
+                    continue
+                latency = metrics['latency_seconds']
+                statuses = ', '.join(f'{status}: {count}' for status, count in metrics['statuses'].items())
+                line = (
+                    f'  {host}: {metrics["requests"]} requests, latency p50 {latency["p50"]}s '
+                    f'p95 {latency["p95"]}s, {metrics["response_bytes"]["sum"] / 1024:.0f} KiB ({statuses})'
+                )
+                if metrics.get('concurrency_limit') is not None:
+                    line += (
+                        f', concurrency {metrics["concurrency_limit"]:.1f} '
+                        f'(max {metrics["max_concurrency_limit"]:.1f})'
+                    )
+                self.stdout.write(line)
@@ -1,11 +1,25 @@
 from typing import Dict, List, Optional
-from .base_scraper import BaseScraper, ProductInfo
-from bs4 import BeautifulSoup
+from .base_scraper import BaseScraper, ProductInfo, has_class
+from .structured_data import StructuredData
+from bs4 import BeautifulSoup, SoupStrainer
 
 class AltraverseScraper(BaseScraper):
     """Scraper for Altraverse manga/light novel website"""
     
     BASE_URL = "https://altraverse.de"
+    PUBLISHER = "Altraverse"
+    REQUESTS_PER_SECOND = 2.0
+    BURST = 4
+
+    # Largest page size Shopware offers by default, newest releases first
+    LISTING_PAGE_SIZE = 48
+    LISTING_ORDER = 1
+
+    LISTING_PARSE_ONLY = SoupStrainer("div", class_=has_class("product--info"))
+    DETAIL_PARSE_ONLY = SoupStrainer(class_=has_class(
+        "product--title", "product--description", "product--image",
+        "product--base-info", "base-info--entry"
+    ))
 
     def _determine_product_type(self, soup: BeautifulSoup) -> str:
         """Determine product type from product details"""
@@ -17,24 +31,15 @@ class AltraverseScraper(BaseScraper):
                 if label and "Produkt" in label.text:
                     content = entry.find("span", class_="entry--content")
                     if content:
-                        content_text = content.text.strip().upper()
-                        if "MANGA" in content_text:
-                            return "MANGA"
-                        elif "LIGHT NOVEL" in content_text:
-                            return "LIGHT_NOVEL"
-                        elif "WEBTOON" in content_text:
-                            return "WEBTOON"
-                        else:
-                            return "OTHER"
+                        return self._product_type_from_text(content.text)
+
+    def _listing_url(self, page: int) -> str:
+        """Build the URL of a listing page"""
+        return f"{self.BASE_URL}/manga/?{self._listing_query(page)}"
 
-    def _get_product_links(self, page: int) -> List[str]:
+    def _parse_product_links(self, content: str) -> List[str]:
         """Extract product links from a listing page"""
-        url = f"{self.BASE_URL}/manga/?p={page}"
-        content = self._fetch_page(url)
-        if not content:
-            return []
-        
-        soup = BeautifulSoup(content, "html.parser")
+        soup = self._make_soup(content, self.LISTING_PARSE_ONLY)
         links = []
         
         for product in soup.select("div.product--info a.product--title[href]"):
@@ -45,13 +50,31 @@ class AltraverseScraper(BaseScraper):
         
         return links
 
-    def _extract_product_details(self, url: str) -> Optional[ProductInfo]:
-        """Extract product details from a product page"""
-        html = self._fetch_page(url)
-        if not html:
+    def _parse_structured_data(self, url: str, data: StructuredData) -> Optional[ProductInfo]:
+        """Read the product from the same elements as the soup parser, via their microdata and regions"""
+        title = data.regions.get("product--title")
+        isbn = data.microdata.get("isbn")
+        release_date = self.parse_date(data.base_info.get("Veröffentlichung", ""), "%d.%m.%Y")
+        product_kind = data.base_info.get("Produkt")
+        description = data.regions.get("product--description")
+        image_url = data.regions.get("product--image")
+        if not all((title, isbn, release_date, product_kind, description, image_url)):
             return None
-            
-        soup = BeautifulSoup(html, "html.parser")
+
+        return ProductInfo(
+            title=title,
+            franchise=self._clean_franchise_name(title),
+            isbn=isbn,
+            description=description,
+            image_url=image_url,
+            release_date=release_date,
+            product_type=self._product_type_from_text(product_kind),
+            url=url
+        )
+
+    def _parse_product_details_soup(self, url: str, html: str) -> Optional[ProductInfo]:
+        """Extract product details from a product page"""
+        soup = self._make_soup(html, self.DETAIL_PARSE_ONLY)
 
         # Extract ISBN and validate
         isbn = soup.select_one('span.entry--content[itemprop="isbn"]')
@@ -60,12 +83,6 @@ class AltraverseScraper(BaseScraper):
             print(f"Invalid ISBN format: {isbn}")
             return None
 
-        # Skip if ISBN already seen
-        if isbn in self._seen_isbns:
-            print(f"Duplicate ISBN found: {isbn}")
-            return None
-        self._seen_isbns.add(isbn)
-
         # Extract basic metadata
         title = soup.select_one("h1.product--title")
         title = title.text.strip() if title else "N/A"
@@ -79,7 +96,7 @@ class AltraverseScraper(BaseScraper):
         franchise = self._clean_franchise_name(title)
 
         # Extract release date and product type
-        release_date = "N/A"
+        release_date = None
         
         for detail in soup.select("li.base-info--entry.entry-attribute"):
             label = detail.select_one("strong.entry--label")
@@ -94,7 +111,7 @@ class AltraverseScraper(BaseScraper):
             value_text = value.text.strip()
             
             if "Veröffentlichung" in label_text:
-                release_date = self.format_date_to_german(value_text, "%d.%m.%Y")
+                release_date = self.parse_date(value_text, "%d.%m.%Y")
         
         product_type = self._determine_product_type(soup)
 
@@ -1,16 +1,67 @@
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
-from datetime import datetime
+from typing import Callable, Collection, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+from urllib.parse import urlencode, urlsplit
+from datetime import date, datetime, timezone
+from itertools import chain, count
+from pathlib import Path
+from xml.etree import ElementTree
+import asyncio
+import multiprocessing
+import os
+import queue
 import re
+import threading
+import time
+import zlib
+import aiohttp
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3 import Retry
-from bs4 import BeautifulSoup
-from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor
-import time
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from .circuit_breaker import CircuitBreaker, get_breaker
+from .concurrency import OVERLOAD_STATUSES, AdaptiveLimit, get_limit
+from .frontier import CrawlFrontier
+from .http_cache import CachedResponse, HttpCache
+from .metrics import ScrapeMetrics
+from .rate_limiter import TokenBucket, get_bucket
+from .retry_budget import BudgetedRetry, RetryBudget
+from .structured_data import StructuredData, extract_structured_data
+from .url_index import UrlIsbnIndex
+
+# Returns the subset of the given ISBNs that is already stored
+KnownIsbns = Callable[[Collection[str]], Set[str]]
+
+# Namespace of the elements of sitemaps and sitemap indexes
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+# Page count of a Shopware listing, stated by its infinite scrolling container or its paging bar
+_PAGE_COUNT_PATTERN = re.compile(r'data-pages="(\d+)"|paging--display[^>]*>\s*von\s*<strong>\s*(\d+)\s*</strong>')
+
+# Posted by a detail worker of the thread engine once the frontier is exhausted
+_WORKER_DONE = object()
+
+
+def has_class(*names: str) -> Callable[[Optional[str]], bool]:
+    """
+    class_ filter for a SoupStrainer that keeps elements carrying any of the given classes.
+
+    A SoupStrainer compares a string or list class_ with the whole class attribute, so it
+    misses elements with several classes like <ul class="product--base-info list--unstyled">.
+    """
+    wanted = frozenset(names)
+
+    def matches(value: Optional[str]) -> bool:
+        if not value:
+            return False
+        return not wanted.isdisjoint(value.split() if isinstance(value, str) else value)
+
+    return matches
+
 
-@dataclass
+@dataclass(slots=True)
 class ProductInfo:
     """Common data model for manga/light novel products"""
     title: str
@@ -18,13 +69,100 @@ class ProductInfo:
     isbn: str
     description: str
     image_url: str
-    release_date: str
-    product_type: str
+    release_date: Optional[date]
+    product_type: Optional[str]
     url: str
 
+# Scraper instance of a parse worker process, set up by _init_parse_worker
+_worker_scraper = None
+
+
+def _init_parse_worker(scraper_cls, base_url: str, html_parser: str) -> None:
+    """Create the parsing-only scraper of a worker process, without session, cache or index"""
+    global _worker_scraper
+    _worker_scraper = scraper_cls.__new__(scraper_cls)
+    _worker_scraper.BASE_URL = base_url
+    _worker_scraper.html_parser = html_parser
+
+
+def _parse_product_details_in_worker(url: str, content: str) -> Tuple[Optional[ProductInfo], float]:
+    """Parse stage entry point, takes raw HTML and returns a picklable ProductInfo and the seconds parsing took"""
+    started = time.perf_counter()
+    product = _worker_scraper._parse_product_details(url, content)
+    return product, time.perf_counter() - started
+
+
 class BaseScraper:
     """Base scraper class with common functionality"""
     
+    BASE_URL = ""
+
+    # Name of the Publisher row the scraped products belong to, set by each publisher scraper
+    PUBLISHER = ""
+
+    ENGINES = ("threads", "asyncio")
+
+    # Retry policy shared by the requests session and the asyncio engine
+    RETRY_TOTAL = 3
+    RETRY_BACKOFF_FACTOR = 1
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    REQUEST_TIMEOUT = 10
+
+    # Retries allowed per run on top of the per-request policy: RETRY_BUDGET_MIN plus
+    # RETRY_BUDGET_RATIO of the requests sent
+    RETRY_BUDGET_MIN = 10
+    RETRY_BUDGET_RATIO = 0.1
+
+    # Circuit breaker per host: opens once CIRCUIT_FAILURE_RATE of the last CIRCUIT_WINDOW requests
+    # failed (0 disables it), refuses requests while open and lets one probe through every
+    # CIRCUIT_RESET_SECONDS
+    CIRCUIT_FAILURE_RATE = 0.5
+    CIRCUIT_WINDOW = 20
+    CIRCUIT_MIN_REQUESTS = 5
+    CIRCUIT_RESET_SECONDS = 30
+
+    # Concurrency limits of the asyncio engine, MAX_CONNECTIONS_PER_HOST also bounds the thread engine
+    MAX_IN_FLIGHT = 200
+    MAX_CONNECTIONS_PER_HOST = 10
+
+    # Requests in flight per host start at INITIAL_CONCURRENCY and adapt between 1 and
+    # MAX_CONNECTIONS_PER_HOST to the host's latency and 429/503 responses (AIMD)
+    ADAPTIVE_CONCURRENCY = True
+    INITIAL_CONCURRENCY = 2
+
+    # Preferred BeautifulSoup tree builder, html.parser is used when it is not installed
+    HTML_PARSER = "lxml"
+
+    # Regions of listing and product pages the scraper reads, everything else is not parsed
+    LISTING_PARSE_ONLY: Optional[SoupStrainer] = None
+    DETAIL_PARSE_ONLY: Optional[SoupStrainer] = None
+
+    # Shopware listing parameters: products per page (n) and sorting (o), None keeps the shop default
+    LISTING_PAGE_SIZE: Optional[int] = None
+    LISTING_ORDER: Optional[int] = None
+
+    # Sitemap index read by sitemap discovery when robots.txt announces none (Shopware default)
+    SITEMAP_PATH = "/sitemap.xml"
+
+    # Path of a product page, sitemap discovery skips the category and CMS pages the sitemaps
+    # also list. Shopware's default SEO URLs end in the article ID and name, /manga/123/name
+    PRODUCT_URL_PATTERN = re.compile(r"/\d+/[^/]+$")
+
+    # Product URLs the listing crawler of the thread engine may queue ahead of the detail workers
+    FRONTIER_SIZE = 100
+
+    # Default politeness limit per host, overridden per publisher
+    REQUESTS_PER_SECOND = 1.0
+    BURST = 1
+
+    # Persistent HTTP cache, revalidated with conditional requests once entries are older than CACHE_FRESH_SECONDS
+    CACHE_DIR = Path(os.getenv("SCRAPER_CACHE_DIR", Path(__file__).resolve().parents[4] / ".scraper_cache"))
+    CACHE_MAX_BYTES = 512 * 1024 * 1024
+    CACHE_FRESH_SECONDS = 60 * 60
+
+    # Incremental runs fetch the detail page of a known product again once its last scrape is older than this
+    INCREMENTAL_REFRESH_SECONDS = 90 * 24 * 60 * 60
+
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     }
@@ -34,54 +172,344 @@ class BaseScraper:
         " Diamond Edition", " - Perfect Edition", " - Collectors Edition", " Collectors Edition"
     }
     
-    def __init__(self, max_workers: int = 5, rate_limit: float = 1):
-        self.session = self._create_session()
-        self.max_workers = max_workers
-        self.rate_limit = rate_limit
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        base_url: Optional[str] = None,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+        use_cache: bool = True,
+        html_parser: Optional[str] = None,
+        parse_processes: int = 0
+    ):
+        """
+        Args:
+            max_workers: Number of worker threads of the thread engine (default MAX_CONNECTIONS_PER_HOST).
+                With ADAPTIVE_CONCURRENCY the requests they send to one host are limited further
+            rate_limit: Minimum seconds between requests to one host, 0 disables throttling.
+                Shorthand for requests_per_second=1/rate_limit
+            base_url: Override BASE_URL, e.g. to scrape a local stand-in server
+            requests_per_second: Allowed request rate per host (default REQUESTS_PER_SECOND)
+            burst: Requests allowed back to back before the rate applies (default BURST)
+            use_cache: Keep pages in the on-disk HTTP cache below CACHE_DIR
+            html_parser: BeautifulSoup tree builder to use (default HTML_PARSER)
+            parse_processes: Parse product pages in a pool of this many processes,
+                0 parses them in the downloading threads
+        """
+        if base_url:
+            self.BASE_URL = base_url.rstrip("/")
+        self.retry_budget = RetryBudget(self.RETRY_BUDGET_MIN, self.RETRY_BUDGET_RATIO)
+        self.session = self._create_session(self.retry_budget)
+        self.max_workers = max_workers or self.MAX_CONNECTIONS_PER_HOST
+        if requests_per_second is None and rate_limit is not None:
+            requests_per_second = 1 / rate_limit if rate_limit > 0 else 0
+        self.requests_per_second = self.REQUESTS_PER_SECOND if requests_per_second is None else requests_per_second
+        self.burst = burst or self.BURST
         self._seen_isbns: Set[str] = set()
+        self._seen_lock = threading.Lock()
+        self.http_cache = HttpCache(self.CACHE_DIR / "http_cache.sqlite3", self.CACHE_MAX_BYTES) if use_cache else None
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._inflight_async: Dict[str, asyncio.Future] = {}
+        self.url_index = UrlIsbnIndex(self.CACHE_DIR / "url_index.sqlite3")
+        self.frontier = CrawlFrontier(self.CACHE_DIR / "frontier.sqlite3", self.PUBLISHER or type(self).__name__)
+        # Measurements of the current or last run, replaced when a run starts
+        self.metrics = ScrapeMetrics(self.PUBLISHER or type(self).__name__)
+        self.html_parser = self._resolve_html_parser(html_parser or self.HTML_PARSER)
+        self.parse_processes = parse_processes
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        # Set to a replay.FixtureArchive to capture every page the scraper fetches
+        self.recorder = None
 
     @staticmethod
-    def _create_session() -> requests.Session:
-        """Create a session with retry logic"""
+    def _resolve_html_parser(name: str) -> str:
+        """Return the requested tree builder if it is installed, html.parser otherwise"""
+        if builder_registry.lookup(name) is None:
+            print(f"HTML parser '{name}' is not available, falling back to html.parser")
+            return "html.parser"
+        return name
+
+    def _make_soup(self, content: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        """Parse a page with the configured backend, keeping only the regions matched by parse_only"""
+        return BeautifulSoup(content, self.html_parser, parse_only=parse_only)
+
+    def _rate_limiter(self, url: str) -> Optional[TokenBucket]:
+        """Return the shared token bucket of the URL's host, or None if throttling is disabled"""
+        if not self.requests_per_second:
+            return None
+        return get_bucket(urlsplit(url).netloc, self.requests_per_second, self.burst)
+
+    def _concurrency_limit(self, url: str) -> Optional[AdaptiveLimit]:
+        """Return the shared adaptive concurrency limit of the URL's host, or None if it is disabled"""
+        if not self.ADAPTIVE_CONCURRENCY:
+            return None
+        return get_limit(urlsplit(url).netloc, self.INITIAL_CONCURRENCY, self.MAX_CONNECTIONS_PER_HOST)
+
+    def _circuit_breaker(self, url: str) -> Optional[CircuitBreaker]:
+        """Return the shared circuit breaker of the URL's host, or None if it is disabled"""
+        if not self.CIRCUIT_FAILURE_RATE:
+            return None
+        return get_breaker(
+            urlsplit(url).netloc,
+            self.CIRCUIT_FAILURE_RATE,
+            self.CIRCUIT_WINDOW,
+            self.CIRCUIT_MIN_REQUESTS,
+            self.CIRCUIT_RESET_SECONDS
+        )
+
+    def _record_outcome(self, breaker: Optional[CircuitBreaker], host: str, failed: bool) -> None:
+        """Pass the outcome of a request to the circuit breaker, reporting when it opens"""
+        if breaker and breaker.record(failed):
+            print(f"Too many failed requests to {host}, pausing them for {self.CIRCUIT_RESET_SECONDS}s")
+
+    @classmethod
+    def _create_session(cls, retry_budget: Optional[RetryBudget] = None) -> requests.Session:
+        """Create a session with retry logic, drawing retries from retry_budget if given"""
         session = requests.Session()
-        retry = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
+        retry = BudgetedRetry(
+            total=cls.RETRY_TOTAL,
+            backoff_factor=cls.RETRY_BACKOFF_FACTOR,
+            status_forcelist=list(cls.RETRY_STATUSES),
+            budget=retry_budget
         )
         adapter = HTTPAdapter(max_retries=retry, pool_connections=100, pool_maxsize=100)
         session.mount("https://", adapter)
         session.mount("http://", adapter)
         return session
 
-    @lru_cache(maxsize=1000)
     def _fetch_page(self, url: str) -> Optional[str]:
-        """Fetch page content with caching and error handling"""
+        """Fetch page content with caching and error handling, sending one request per URL at a time"""
+        with self._inflight_lock:
+            future = self._inflight.get(url)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[url] = Future()
+        if not is_leader:
+            return future.result()
+
+        content = None
+        try:
+            content = self._download_page(url)
+            if content is not None and self.recorder is not None:
+                self.recorder.add(url, content)
+        finally:
+            with self._inflight_lock:
+                del self._inflight[url]
+            future.set_result(content)
+        return content
+
+    def _download_page(self, url: str) -> Optional[str]:
+        """Fetch page content, revalidating a cached copy with a conditional request"""
+        host = urlsplit(url).netloc
+        cached, is_fresh = self._cache_lookup(url)
+        if is_fresh:
+            self.metrics.record_cache_hit(host)
+            return cached.body
+
+        limit = self._concurrency_limit(url)
+        ticket = limit.acquire() if limit else None
+        # Checked once a slot is free, so requests queued behind a failing host fail right away
+        breaker = self._circuit_breaker(url)
+        if breaker and not breaker.allow():
+            if limit:
+                limit.release(ticket, None, False)
+            self.metrics.record_short_circuit(host)
+            return None
+
+        latency, overloaded, failed = None, False, False
+        started = None
         try:
-            response = self.session.get(url, headers=self.HEADERS, timeout=10)
+            self.retry_budget.record_request()
+            bucket = self._rate_limiter(url)
+            if bucket:
+                self.metrics.record_throttle(host, bucket.acquire())
+            started = time.monotonic()
+            response = self.session.get(url, headers=self._request_headers(cached), timeout=self.REQUEST_TIMEOUT)
+            retries = response.raw.retries.history if getattr(response.raw, "retries", None) else ()
+            latency = time.monotonic() - started
+            self.metrics.record_request(host, latency, response.status_code, len(response.content), len(retries))
+            started = None
+            statuses = [response.status_code] + [retry.status for retry in retries]
+            overloaded = any(status in OVERLOAD_STATUSES for status in statuses)
+            failed = response.status_code >= 500
+            if retries:
+                # The backoff of the retries is part of the latency, only their statuses tell something
+                latency = None
+            if response.status_code == 304 and cached:
+                self.http_cache.mark_validated(url)
+                return cached.body
             response.raise_for_status()
-            return response.text
+            content = self._gunzipped(response.content)
+            if content is None:
+                content = response.text
+            self._cache_store(url, content, response.headers)
+            return content
+        except Exception as e:
+            if started is not None:
+                # No response, the retries urllib3 makes on connection errors are used up
+                retried = isinstance(e, (requests.ConnectionError, requests.exceptions.RetryError))
+                self.metrics.record_request(
+                    host, time.monotonic() - started, None, retries=self.RETRY_TOTAL if retried else 0
+                )
+                overloaded = failed = True
+            print(f"Error fetching {url}: {str(e)}")
+            return None
+        finally:
+            if limit:
+                limit.release(ticket, latency, overloaded)
+                self.metrics.record_concurrency(host, limit.limit)
+            self._record_outcome(breaker, host, failed)
+
+    async def _fetch_page_async(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Event loop variant of _fetch_page"""
+        future = self._inflight_async.get(url)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = self._inflight_async[url] = asyncio.get_running_loop().create_future()
+        content = None
+        try:
+            content = await self._download_page_async(session, url)
+            if content is not None and self.recorder is not None:
+                self.recorder.add(url, content)
+        finally:
+            del self._inflight_async[url]
+            future.set_result(content)
+        return content
+
+    async def _download_page_async(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """
+        Fetch page content on the event loop, mirroring the retry policy of the requests session
+
+        Args:
+            session: Session created by scrape_products_async
+            url: Page to fetch
+
+        Returns:
+            Decoded page content, or None if the request failed
+        """
+        host = urlsplit(url).netloc
+        cached, is_fresh = self._cache_lookup(url)
+        if is_fresh:
+            self.metrics.record_cache_hit(host)
+            return cached.body
+
+        breaker = self._circuit_breaker(url)
+        bucket = self._rate_limiter(url)
+        limit = self._concurrency_limit(url)
+        started = time.monotonic()
+        # Time spent waiting for a token or a slot, which is not part of the latency
+        waited = 0.0
+        attempt = 0
+        allowed = failed = False
+        try:
+            for attempt in range(self.RETRY_TOTAL + 1):
+                if limit:
+                    slot_requested_at = time.monotonic()
+                    ticket = await limit.acquire_async()
+                    waited += time.monotonic() - slot_requested_at
+                if not allowed:
+                    # Checked once a slot is free, as in _download_page
+                    if breaker and not breaker.allow():
+                        if limit:
+                            limit.release(ticket, None, False)
+                        self.metrics.record_short_circuit(host)
+                        return None
+                    allowed = True
+                    self.retry_budget.record_request()
+                if bucket:
+                    wait = await bucket.acquire_async()
+                    self.metrics.record_throttle(host, wait)
+                    waited += wait
+                sent_at = time.monotonic()
+                latency, overloaded = None, False
+                try:
+                    async with session.get(url, headers=self._request_headers(cached)) as response:
+                        body = await response.read()
+                    latency, overloaded = time.monotonic() - sent_at, response.status in OVERLOAD_STATUSES
+                except Exception:
+                    overloaded = True
+                    raise
+                finally:
+                    if limit:
+                        limit.release(ticket, latency, overloaded)
+                        self.metrics.record_concurrency(host, limit.limit)
+
+                retry = response.status in self.RETRY_STATUSES and attempt < self.RETRY_TOTAL
+                if retry and (response.status == 429 or self.retry_budget.try_spend()):
+                    await asyncio.sleep(self.RETRY_BACKOFF_FACTOR * (2 ** attempt))
+                    continue
+                self.metrics.record_request(
+                    host, time.monotonic() - started - waited, response.status, len(body), attempt
+                )
+                started = None
+                failed = response.status >= 500
+                if response.status == 304 and cached:
+                    self.http_cache.mark_validated(url)
+                    return cached.body
+                response.raise_for_status()
+                content = self._gunzipped(body)
+                if content is None:
+                    content = await response.text()
+                self._cache_store(url, content, response.headers)
+                return content
         except Exception as e:
+            if started is not None:
+                self.metrics.record_request(host, time.monotonic() - started - waited, None, retries=attempt)
+                failed = True
             print(f"Error fetching {url}: {str(e)}")
+        finally:
+            if allowed:
+                self._record_outcome(breaker, host, failed)
+        return None
+
+    def _cache_lookup(self, url: str) -> Tuple[Optional[CachedResponse], bool]:
+        """Return the cached entry of a URL and whether it can be used without revalidation"""
+        if not self.http_cache:
+            return None, False
+        cached = self.http_cache.get(url)
+        if not cached:
+            return None, False
+        return cached, time.time() - cached.validated_at < self.CACHE_FRESH_SECONDS
+
+    def _request_headers(self, cached: Optional[CachedResponse]) -> Dict[str, str]:
+        """Default headers, plus the validators of a cached entry"""
+        headers = dict(self.HEADERS)
+        if cached:
+            headers.update(cached.conditional_headers())
+        return headers
+
+    @staticmethod
+    def _gunzipped(body: bytes) -> Optional[str]:
+        """
+        Text of a gzipped body, None for any other body. Gzipped sitemaps (.xml.gz) are served
+        as files rather than with a Content-Encoding, so the HTTP client leaves them compressed.
+        """
+        if body[:2] != b"\x1f\x8b":
             return None
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS).decode("utf-8")
+
+    def _cache_store(self, url: str, content: str, headers: Mapping[str, str]) -> None:
+        if self.http_cache:
+            self.http_cache.store(url, content, headers.get("ETag"), headers.get("Last-Modified"))
 
     @staticmethod
-    def format_date_to_german(date_str: str, input_format: str = "%Y-%m-%d") -> str:
+    def parse_date(date_str: str, input_format: str = "%Y-%m-%d") -> Optional[date]:
         """
-        Convert date string to German format (dd.mm.yyyy)
+        Parse a date string scraped from a product page
         
         Args:
             date_str: Date string to parse
             input_format: Expected format of input date string (default: YYYY-MM-DD)
             
         Returns:
-            Date string in dd.mm.yyyy format, or 'N/A' if parsing fails
+            Parsed date, or None if parsing fails
         """
         try:
-            date_obj = datetime.strptime(date_str.strip(), input_format)
-            return date_obj.strftime("%d.%m.%Y")
+            return datetime.strptime(date_str.strip(), input_format).date()
         except (ValueError, AttributeError):
-            return "N/A"
+            return None
 
     def _extract_meta_content(self, soup: BeautifulSoup, property_name: str) -> str:
         """Extract content from meta tags"""
@@ -94,75 +522,692 @@ class BaseScraper:
         isbn_pattern = r'^\d{3}-\d-\d{4}-\d{4}-\d$'
         return bool(re.match(isbn_pattern, isbn))
 
-    def scrape_products(self, start_page: int = 1, max_pages: int = 5) -> Dict[str, List[Dict]]:
+    def scrape_products(
+        self,
+        start_page: int = 1,
+        max_pages: int = 5,
+        engine: str = "threads",
+        incremental: bool = False,
+        known_isbns: Optional[KnownIsbns] = None,
+        resume: bool = False,
+        sitemap: bool = False
+    ) -> Dict[str, List[Dict]]:
         """
         Main scraping function that coordinates the scraping process using helper methods.
         
         Args:
             start_page: Starting page number for pagination
             max_pages: Maximum number of pages to scrape
+            engine: "threads" for the thread pool engine, "asyncio" for the event loop engine
+            incremental: Only fetch product pages that are new or stale, and stop at the
+                first listing page that holds only known products
+            known_isbns: Bulk lookup of ISBNs that are already stored, used by incremental runs.
+                Without it every indexed URL counts as known
+            resume: Continue the interrupted previous run instead of starting over
+                (thread engine only)
+            sitemap: Discover products from the sitemaps instead of the listing pages
+                (thread engine only), see iter_products
             
         Returns:
             Dictionary of franchises with their products
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        if engine == "asyncio":
+            if resume or sitemap:
+                raise ValueError("Resuming and sitemap discovery require the threads engine")
+            return asyncio.run(self.scrape_products_async(start_page, max_pages, incremental, known_isbns))
+
         franchises: Dict[str, List[Dict]] = {}
-        current_page = start_page
-        
-        while current_page < start_page + max_pages:
-            product_links = self._get_product_links(current_page)
-            if not product_links:
-                break
-                
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                future_to_url = {
-                    executor.submit(self._extract_product_details, url): url 
-                    for url in product_links
-                }
-                
-                for future in future_to_url:
+        products = []
+        for product in self.iter_products(
+            start_page, max_pages, incremental, known_isbns, resume=resume, sitemap=sitemap
+        ):
+            self._add_product(franchises, product)
+            products.append(product)
+        self.checkpoint(products)
+        return franchises
+
+    def iter_products(
+        self,
+        start_page: int = 1,
+        max_pages: Optional[int] = 5,
+        incremental: bool = False,
+        known_isbns: Optional[KnownIsbns] = None,
+        timeout: Optional[float] = None,
+        resume: bool = False,
+        sitemap: bool = False
+    ) -> Iterator[ProductInfo]:
+        """
+        Thread engine: yield scraped products as soon as their page is parsed.
+
+        One thread walks the listing pages and feeds their product URLs into a bounded
+        frontier queue, max_workers threads take URLs from any page off that queue.
+        A slow product page therefore only occupies its own worker instead of holding
+        back the next listing page.
+
+        Progress is recorded in the crawl frontier. Yielded products count as done once
+        the consumer passes them to checkpoint, e.g. after writing them to the database.
+
+        Args:
+            start_page: Starting page number for pagination
+            max_pages: Maximum number of pages to scrape, None walks up to the page count
+                the first listing page states, or up to the first empty page
+            incremental: See scrape_products
+            known_isbns: See scrape_products
+            timeout: Seconds after which the scrape is stopped, even if pages are pending
+            resume: Continue the previous run: product URLs that are not done yet are
+                fetched first, then the listing pages after the last recorded one
+            sitemap: Discover product URLs from the shop's sitemaps instead of the listing
+                pages. Incremental runs then only queue URLs whose lastmod is newer than
+                the start of the last run that read the whole sitemap
+
+        Yields:
+            New products in the order their pages finish
+        """
+        frontier: queue.Queue = queue.Queue(maxsize=self.FRONTIER_SIZE)
+        results: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        self._begin_run()
+
+        since = self.frontier.last_discovery() if sitemap and incremental else None
+        pending_urls: List[str] = []
+        if resume:
+            last_page, exhausted = self.frontier.listing_state()
+            pending_urls = self.frontier.pending_urls()
+            with self._seen_lock:
+                self._seen_isbns.update(self.frontier.seen_isbns())
+            if exhausted:
+                max_pages = 0
+            elif last_page is not None:
+                if max_pages is not None:
+                    max_pages -= last_page + 1 - start_page
+                start_page = last_page + 1
+            print(f"Resuming with {len(pending_urls)} pending products, listing from page {start_page}")
+        else:
+            self.frontier.reset()
+
+        with self._parse_stage(), ThreadPoolExecutor(max_workers=self.max_workers + 1) as executor:
+            executor.submit(
+                self._crawl_listings,
+                frontier, stop, start_page, max_pages, incremental, known_isbns, pending_urls, sitemap, since
+            )
+            for _ in range(self.max_workers):
+                executor.submit(self._crawl_details, frontier, results, stop)
+
+            deadline = time.monotonic() + timeout if timeout else None
+            try:
+                workers_left = self.max_workers
+                while workers_left:
+                    remaining = deadline - time.monotonic() if deadline else None
                     try:
-                        product = future.result()
-                        if not product:
+                        if remaining is not None and remaining <= 0:
+                            raise queue.Empty
+                        item = results.get(timeout=remaining)
+                    except queue.Empty:
+                        print(f"Scrape timed out after {timeout} seconds")
+                        return
+                    if item is _WORKER_DONE:
+                        workers_left -= 1
+                        continue
+                    url, product = item
+                    if isinstance(product, Future):
+                        try:
+                            product, seconds = product.result()
+                            self.metrics.record_parse("detail", seconds)
+                        except Exception as e:
+                            print(f"Error processing product: {str(e)}")
+                            self.frontier.record_failure(url)
                             continue
-                        
-                        if product.franchise not in franchises:
-                            franchises[product.franchise] = []
-                        
-                        self.log_product(product)
-
-                        franchises[product.franchise].append({
-                            "title": product.title,
-                            "image": product.image_url,
-                            "description": product.description,
-                            "isbn": product.isbn,
-                            "link": product.url,
-                            "release_date": product.release_date,
-                            "type": product.product_type
-                        })
-                    
-                    except Exception as e:
-                        print(f"Error processing product: {str(e)}")
-                    
-                    time.sleep(self.rate_limit)
-            
-            print(f"Completed page {current_page}")
-            current_page += 1
-            
+                    if self._accept_product(product):
+                        yield product
+                    else:
+                        # Nothing to store for this page, so it needs no checkpoint
+                        self.frontier.mark_done([(url, None)])
+
+                if sitemap and self.frontier.listing_state()[1]:
+                    # The next incremental run reads the sitemap from the same point again, so
+                    # products whose pages failed are found once more rather than lost
+                    failed = self.frontier.failed_urls()
+                    if failed:
+                        print(f"{len(failed)} product pages failed, keeping the previous sitemap watermark")
+                    else:
+                        self.frontier.complete_discovery()
+            finally:
+                # Also reached when the consumer stops iterating early
+                stop.set()
+                self._report_metrics()
+
+    def _begin_run(self) -> None:
+        """Start the metrics and the retry budget of a new run"""
+        self.metrics = ScrapeMetrics(self.PUBLISHER or type(self).__name__)
+        self.retry_budget.reset()
+
+    def _report_metrics(self) -> None:
+        """Print the summary of the finished run and save it below CACHE_DIR/metrics"""
+        self.metrics.record_retry_budget(self.retry_budget.retries, self.retry_budget.denied)
+        self.metrics.finish()
+        print(self.metrics.summary_line())
+        try:
+            self.metrics.save(self.CACHE_DIR / "metrics")
+        except OSError as e:
+            print(f"Error saving scrape metrics: {str(e)}")
+
+    @contextmanager
+    def _parse_stage(self):
+        """
+        Provide the process pool product pages are parsed in for the duration of a scrape.
+
+        Parsing is CPU-bound and would serialize on the GIL in the downloading threads.
+        Workers are spawned rather than forked, as the scrape is already multi-threaded.
+        """
+        if not self.parse_processes:
+            yield
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=self.parse_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_parse_worker,
+            initargs=(type(self), self.BASE_URL, self.html_parser)
+        ) as pool:
+            self._parse_pool = pool
+            try:
+                yield
+            finally:
+                self._parse_pool = None
+
+    def _crawl_listings(
+        self,
+        frontier: queue.Queue,
+        stop: threading.Event,
+        start_page: int,
+        max_pages: Optional[int],
+        incremental: bool,
+        known_isbns: Optional[KnownIsbns],
+        pending_urls: List[str],
+        sitemap: bool = False,
+        since: Optional[float] = None
+    ) -> None:
+        """
+        Listing stage of the thread engine, ends with one stop marker per detail worker.
+        Product URLs left pending by a previous run are queued before any new ones.
+        """
+        try:
+            for url in pending_urls:
+                if not self._queue_url(frontier, url, stop):
+                    return
+
+            if sitemap:
+                self._queue_sitemap_urls(frontier, stop, since)
+            else:
+                self._queue_listing_pages(frontier, stop, start_page, max_pages, incremental, known_isbns)
+        except Exception as e:
+            print(f"Error crawling listing pages: {str(e)}")
+        finally:
+            for _ in range(self.max_workers):
+                if not self._put_until_stopped(frontier, None, stop):
+                    break
+
+    def _queue_listing_pages(
+        self,
+        frontier: queue.Queue,
+        stop: threading.Event,
+        start_page: int,
+        max_pages: Optional[int],
+        incremental: bool,
+        known_isbns: Optional[KnownIsbns]
+    ) -> None:
+        """
+        Walk the paginated listing and queue the product URLs of every page in page order.
+
+        If the first page states the page count, the remaining pages are requested in
+        parallel. Incremental runs keep requesting them one by one, as they usually stop
+        after the first pages of the newest-first listing.
+        Without max_pages and a stated page count, pages are requested until an empty one.
+        """
+        if max_pages is not None and max_pages < 1:
+            return
+        first_links, page_count = self._get_listing(start_page)
+        last_page = None if max_pages is None else start_page + max_pages - 1
+        if page_count:
+            last_page = min(last_page or page_count, page_count)
+        pages = count(start_page + 1) if last_page is None else range(start_page + 1, last_page + 1)
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            if page_count and not incremental:
+                listings = zip(pages, pool.map(self._get_product_links, pages))
+            else:
+                listings = ((page, self._get_product_links(page)) for page in pages)
+
+            for page, product_links in chain([(start_page, first_links)], listings):
+                if product_links is None:
+                    # Leave the listing cursor on the last queued page, so a resumed run retries this one
+                    print(f"Listing page {page} could not be fetched, stopping the listing crawl")
+                    return
+                if not product_links:
+                    self.frontier.mark_exhausted()
+                    return
+
+                if incremental:
+                    product_links = self._select_product_links(product_links, known_isbns)
+                    if not product_links:
+                        print(f"Page {page} only holds known products, stopping")
+                        self.frontier.mark_exhausted()
+                        return
+
+                self.frontier.record_listing_page(page, product_links)
+                for url in product_links:
+                    if not self._queue_url(frontier, url, stop):
+                        return
+                print(f"Queued page {page}")
+
+            if page_count and last_page == page_count:
+                self.frontier.mark_exhausted()
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def _queue_sitemap_urls(self, frontier: queue.Queue, stop: threading.Event, since: Optional[float]) -> None:
+        """
+        Queue the product URLs of the shop's sitemaps that changed after since.
+        The discovery only counts as complete if every sitemap could be read.
+        """
+        queued = 0
+        complete = True
+        for sitemap_url in self._sitemap_urls():
+            urls = self._read_sitemap(sitemap_url, since)
+            if urls is None:
+                complete = False
+                continue
+            product_urls = [url for url in urls if self._is_product_url(url)]
+            if urls and not product_urls:
+                print(f"None of the {len(urls)} URLs of {sitemap_url} match PRODUCT_URL_PATTERN")
+            # URLs a resumed run already knows are pending or done
+            for url in self.frontier.add_urls(product_urls):
+                if not self._queue_url(frontier, url, stop):
+                    return
+                queued += 1
+        if complete:
+            self.frontier.mark_exhausted()
+        print(f"Queued {queued} product URLs from the sitemap")
+
+    def _is_product_url(self, url: str) -> bool:
+        return bool(self.PRODUCT_URL_PATTERN.search(urlsplit(url).path))
+
+    def _sitemap_urls(self) -> List[str]:
+        """Sitemaps announced in robots.txt, or the default location if there are none"""
+        robots = self._fetch_page(f"{self.BASE_URL}/robots.txt") or ""
+        urls = [
+            line.split(":", 1)[1].strip()
+            for line in robots.splitlines()
+            if line.lower().startswith("sitemap:")
+        ]
+        return urls or [self.BASE_URL + self.SITEMAP_PATH]
+
+    def _read_sitemap(self, url: str, since: Optional[float]) -> Optional[List[str]]:
+        """
+        Parse a sitemap or sitemap index, following the sitemaps an index lists.
+        Sitemaps are fetched like any page, through the cache, the per-host limits and the
+        circuit breaker, and parsed as a whole document.
+
+        Args:
+            url: Sitemap to read
+            since: Timestamp entries must have been modified after, None keeps all entries
+
+        Returns:
+            Page URLs that were modified after since, or that carry no lastmod.
+            None if the sitemap or one of the sitemaps it lists could not be fetched.
+        """
+        content = self._fetch_page(url)
+        if content is None:
+            return None
+
+        pages, sitemaps = [], []
+        for element in ElementTree.fromstring(content):
+            if element.tag not in (_SITEMAP_NS + "url", _SITEMAP_NS + "sitemap"):
+                continue
+            loc = (element.findtext(_SITEMAP_NS + "loc") or "").strip()
+            if loc and self._modified_since(element.findtext(_SITEMAP_NS + "lastmod"), since):
+                (pages if element.tag == _SITEMAP_NS + "url" else sitemaps).append(loc)
+
+        for sitemap_url in sitemaps:
+            listed = self._read_sitemap(sitemap_url, since)
+            if listed is None:
+                return None
+            pages.extend(listed)
+        return pages
+
+    @staticmethod
+    def _modified_since(lastmod: Optional[str], since: Optional[float]) -> bool:
+        """Compare a W3C datetime lastmod with a timestamp, entries without a usable lastmod count as modified"""
+        if since is None or not lastmod:
+            return True
+        try:
+            modified = datetime.fromisoformat(lastmod.strip())
+        except ValueError:
+            return True
+        if modified.tzinfo is None:
+            modified = modified.replace(tzinfo=timezone.utc)
+        return modified.timestamp() > since
+
+    def _crawl_details(self, frontier: queue.Queue, results: queue.Queue, stop: threading.Event) -> None:
+        """Detail stage of the thread engine, hands downloaded pages to the parse pool if there is one"""
+        try:
+            while not stop.is_set():
+                try:
+                    item = frontier.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+                url, queued_at = item
+                self.metrics.record_queue_wait(time.monotonic() - queued_at)
+                try:
+                    content = self._fetch_page(url)
+                    if not content:
+                        self.frontier.record_failure(url)
+                    elif self._parse_pool:
+                        results.put((url, self._parse_pool.submit(_parse_product_details_in_worker, url, content)))
+                    else:
+                        results.put((url, self._timed_parse_product_details(url, content)))
+                except Exception as e:
+                    print(f"Error processing product: {str(e)}")
+                    self.frontier.record_failure(url)
+        finally:
+            results.put(_WORKER_DONE)
+
+    def _queue_url(self, frontier: queue.Queue, url: str, stop: threading.Event) -> bool:
+        """Put a product URL into the frontier queue along with the time it was queued"""
+        return self._put_until_stopped(frontier, (url, time.monotonic()), stop)
+
+    @staticmethod
+    def _put_until_stopped(target: queue.Queue, item, stop: threading.Event) -> bool:
+        """Put into a bounded queue, giving up once the run is stopped"""
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    async def scrape_products_async(
+        self,
+        start_page: int = 1,
+        max_pages: int = 5,
+        incremental: bool = False,
+        known_isbns: Optional[KnownIsbns] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Event loop variant of scrape_products.
+
+        Once the first listing page has arrived, the remaining ones are requested
+        concurrently on a single thread, up to the page count the first page states.
+        The product pages of each listing are requested as soon as it arrives.
+        MAX_IN_FLIGHT bounds the product pages being fetched at once, further ones are only
+        scheduled as earlier ones finish. MAX_CONNECTIONS_PER_HOST and the shared per-host
+        token bucket bound the requests per host. Products are collected in listing order.
+
+        Args:
+            start_page: Starting page number for pagination
+            max_pages: Maximum number of pages to scrape
+            incremental: See scrape_products
+            known_isbns: See scrape_products
+
+        Returns:
+            Dictionary of franchises with their products
+        """
+        self._begin_run()
+        connector = aiohttp.TCPConnector(limit=self.MAX_IN_FLIGHT, limit_per_host=self.MAX_CONNECTIONS_PER_HOST)
+        timeout = aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
+        with self._parse_stage():
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.HEADERS) as session:
+                first_links, page_count = await self._get_listing_async(session, start_page)
+                last_page = start_page + max_pages - 1
+                if page_count:
+                    last_page = min(last_page, page_count)
+                pages = range(start_page + 1, last_page + 1)
+                listing_tasks = [
+                    asyncio.create_task(self._get_product_links_async(session, page)) for page in pages
+                ]
+                detail_tasks = []
+                # Taken before a product page task is created and freed once it is done
+                detail_slots = asyncio.Semaphore(self.MAX_IN_FLIGHT)
+
+                # Pages after the first empty one are dropped, as the thread engine never requests them
+                try:
+                    for page, page_links in chain([(start_page, first_links)], zip(pages, listing_tasks)):
+                        if isinstance(page_links, asyncio.Task):
+                            page_links = await page_links
+                        if page_links is None:
+                            print(f"Listing page {page} could not be fetched, stopping the listing crawl")
+                            break
+                        if not page_links:
+                            break
+                        if incremental:
+                            page_links = self._select_product_links(page_links, known_isbns)
+                            if not page_links:
+                                print(f"Page {page} only holds known products, stopping")
+                                break
+                        for url in page_links:
+                            await detail_slots.acquire()
+                            task = asyncio.create_task(self._extract_product_details_async(session, url))
+                            task.add_done_callback(lambda _: detail_slots.release())
+                            detail_tasks.append(task)
+                        print(f"Queued page {page}")
+                finally:
+                    for listing_task in listing_tasks:
+                        listing_task.cancel()
+                    await asyncio.gather(*listing_tasks, return_exceptions=True)
+
+                products = await asyncio.gather(*detail_tasks, return_exceptions=True)
+
+        franchises: Dict[str, List[Dict]] = {}
+        for product in products:
+            if isinstance(product, Exception):
+                print(f"Error processing product: {str(product)}")
+                continue
+            if self._accept_product(product):
+                self._add_product(franchises, product)
+        self._report_metrics()
         return franchises
 
-    def _get_product_links(self, page: int) -> List[str]:
+    def _select_product_links(self, product_links: List[str], known_isbns: Optional[KnownIsbns]) -> List[str]:
         """
-        Abstract method to be implemented by specific scrapers
-        Returns list of product URLs from a listing page
+        Drop the links of a listing page whose product is already known
+
+        Args:
+            product_links: Product URLs of one listing page
+            known_isbns: Bulk lookup of stored ISBNs, queried once for the whole page
+
+        Returns:
+            Product URLs that are not indexed yet, were last scraped before
+            INCREMENTAL_REFRESH_SECONDS, or whose ISBN is missing from the store
+        """
+        refreshed_after = time.time() - self.INCREMENTAL_REFRESH_SECONDS
+        indexed = {
+            url: isbn
+            for url, (isbn, scraped_at) in self.url_index.lookup(product_links).items()
+            if scraped_at >= refreshed_after
+        }
+        if known_isbns:
+            known = known_isbns(set(indexed.values()))
+        else:
+            known = set(indexed.values())
+        return [url for url in product_links if indexed.get(url) not in known]
+
+    def _accept_product(self, product: Optional[ProductInfo]) -> bool:
+        """Record a scraped product, returning False if there is none or its ISBN was already collected"""
+        if not product:
+            return False
+
+        self.url_index.record(product.url, product.isbn)
+
+        with self._seen_lock:
+            duplicate = product.isbn in self._seen_isbns
+            self._seen_isbns.add(product.isbn)
+        if duplicate:
+            print(f"Duplicate ISBN found: {product.isbn}")
+            return False
+
+        self.metrics.record_product()
+        self.log_product(product)
+        return True
+
+    def checkpoint(self, products: Collection[ProductInfo]) -> None:
+        """Mark the pages of products that were stored as done in the crawl frontier"""
+        self.frontier.mark_done((product.url, product.isbn) for product in products)
+
+    @staticmethod
+    def _add_product(franchises: Dict[str, List[Dict]], product: ProductInfo) -> None:
+        """Append a product to its franchise in the dictionary returned by scrape_products"""
+        if product.franchise not in franchises:
+            franchises[product.franchise] = []
+
+        franchises[product.franchise].append({
+            "title": product.title,
+            "image": product.image_url,
+            "description": product.description,
+            "isbn": product.isbn,
+            "link": product.url,
+            "release_date": product.release_date.strftime("%d.%m.%Y") if product.release_date else "N/A",
+            "type": product.product_type
+        })
+
+    def _get_product_links(self, page: int) -> Optional[List[str]]:
+        """Fetch a listing page and return its product URLs, None if it could not be fetched"""
+        return self._get_listing(page)[0]
+
+    def _get_listing(self, page: int) -> Tuple[Optional[List[str]], Optional[int]]:
         """
-        raise NotImplementedError("Subclasses must implement _get_product_links")
+        Fetch a listing page and return its product URLs and the page count it states.
+
+        The URLs are None if the page could not be fetched (timeout, error status, open
+        circuit breaker), as opposed to an empty list for a page past the end of the listing.
+        """
+        content = self._fetch_page(self._listing_url(page))
+        if not content:
+            return None, None
+        return self._parse_listing(content)
+
+    def _parse_listing(self, content: str) -> Tuple[List[str], Optional[int]]:
+        """Parse the product URLs and the page count of a listing page, recording the parse time"""
+        started = time.perf_counter()
+        listing = self._parse_product_links(content), self._parse_page_count(content)
+        self.metrics.record_parse("listing", time.perf_counter() - started)
+        return listing
 
     def _extract_product_details(self, url: str) -> Optional[ProductInfo]:
+        """Fetch a product page and return its product information"""
+        content = self._fetch_page(url)
+        if not content:
+            return None
+        return self._timed_parse_product_details(url, content)
+
+    def _timed_parse_product_details(self, url: str, content: str) -> Optional[ProductInfo]:
+        """_parse_product_details, recording the parse time"""
+        started = time.perf_counter()
+        product = self._parse_product_details(url, content)
+        self.metrics.record_parse("detail", time.perf_counter() - started)
+        return product
+
+    async def _get_product_links_async(self, session: aiohttp.ClientSession, page: int) -> Optional[List[str]]:
+        """Event loop variant of _get_product_links"""
+        return (await self._get_listing_async(session, page))[0]
+
+    async def _get_listing_async(
+        self,
+        session: aiohttp.ClientSession,
+        page: int
+    ) -> Tuple[Optional[List[str]], Optional[int]]:
+        """Event loop variant of _get_listing"""
+        content = await self._fetch_page_async(session, self._listing_url(page))
+        if not content:
+            return None, None
+        return self._parse_listing(content)
+
+    async def _extract_product_details_async(self, session: aiohttp.ClientSession, url: str) -> Optional[ProductInfo]:
+        """Event loop variant of _extract_product_details"""
+        content = await self._fetch_page_async(session, url)
+        if not content:
+            return None
+        if self._parse_pool:
+            product, seconds = await asyncio.get_running_loop().run_in_executor(
+                self._parse_pool, _parse_product_details_in_worker, url, content
+            )
+            self.metrics.record_parse("detail", seconds)
+            return product
+        return self._timed_parse_product_details(url, content)
+
+    def _listing_query(self, page: int) -> str:
+        """Query string of a listing page with the configured page size and sorting"""
+        params = {"p": page, "n": self.LISTING_PAGE_SIZE, "o": self.LISTING_ORDER}
+        return urlencode({name: value for name, value in params.items() if value is not None})
+
+    @staticmethod
+    def _parse_page_count(content: str) -> Optional[int]:
+        """
+        Read the number of listing pages from a Shopware listing page, None if it states none.
+        Matched on the raw HTML, as the listing regions are the only ones that get parsed.
+        """
+        match = _PAGE_COUNT_PATTERN.search(content)
+        if not match:
+            return None
+        return int(match.group(1) or match.group(2))
+
+    def _listing_url(self, page: int) -> str:
+        """
+        Abstract method to be implemented by specific scrapers
+        Returns the URL of a listing page
+        """
+        raise NotImplementedError("Subclasses must implement _listing_url")
+
+    def _parse_product_links(self, html: str) -> List[str]:
         """
         Abstract method to be implemented by specific scrapers
-        Returns product information from a product page
+        Returns list of product URLs from the content of a listing page
         """
-        raise NotImplementedError("Subclasses must implement _extract_product_details")
+        raise NotImplementedError("Subclasses must implement _parse_product_links")
+
+    def _parse_product_details(self, url: str, html: str) -> Optional[ProductInfo]:
+        """
+        Return product information from the content of a product page.
+        The structured data of the page is read first, a soup is only built if it is incomplete.
+        """
+        product = self._parse_structured_data(url, extract_structured_data(html))
+        if product is None:
+            return self._parse_product_details_soup(url, html)
+        if not self.is_valid_isbn(product.isbn):
+            return None
+        return product
+
+    def _parse_structured_data(self, url: str, data: StructuredData) -> Optional[ProductInfo]:
+        """
+        Fast path of _parse_product_details, to be implemented by scrapers whose pages carry structured data
+        Returns product information if the page provides every field, None otherwise
+        """
+        return None
+
+    def _parse_product_details_soup(self, url: str, html: str) -> Optional[ProductInfo]:
+        """
+        Abstract method to be implemented by specific scrapers
+        Returns product information from the content of a product page
+        """
+        raise NotImplementedError("Subclasses must implement _parse_product_details_soup")
+
+    @staticmethod
+    def _product_type_from_text(text: str) -> str:
+        """Map the product kind a shop states, e.g. "Manga" or "Light Novel", to a PRODUCT_TYPE key"""
+        text = text.strip().upper()
+        if "MANGA" in text:
+            return "MANGA"
+        elif "LIGHT NOVEL" in text:
+            return "LIGHT_NOVEL"
+        elif "WEBTOON" in text:
+            return "WEBTOON"
+        else:
+            return "OTHER"
     
     def log_product(self, product: ProductInfo) -> None:
         """Log product information for debugging"""
@@ -0,0 +1,123 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, Tuple, Type
+import io
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .base_scraper import BaseScraper
+from .replay import FixtureArchive, ReplayServer
+
+
+def benchmark_scraper(
+    scraper_cls: Type[BaseScraper],
+    archive_path: Path,
+    engine: str = "threads",
+    max_workers: int = 5,
+    parse_processes: int = 0,
+    latency: float = 0.0,
+    error_rate: float = 0.0,
+    max_pages: int = 1000
+) -> Dict:
+    """
+    Scrape a recorded archive through a local ReplayServer and measure the run.
+
+    Throttling and the HTTP cache are disabled, so the numbers reflect the scraper
+    itself. Run it in a fresh process (see run_isolated) to get a per-scraper peak RSS.
+
+    Returns:
+        Pages fetched per second, peak RSS of the process, and parse time and allocations
+        per page with the structured data fast path and with the soup parsers alone
+    """
+    archive = FixtureArchive.load(archive_path)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Keep the URL index of the benchmark away from the real one
+        scraper_cls.CACHE_DIR = Path(cache_dir)
+        with ReplayServer(archive, latency=latency, error_rate=error_rate) as server:
+            scraper = scraper_cls(
+                max_workers=max_workers,
+                rate_limit=0,
+                base_url=server.url,
+                use_cache=False,
+                parse_processes=parse_processes
+            )
+            with redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                franchises = scraper.scrape_products(max_pages=max_pages, engine=engine)
+                seconds = time.perf_counter() - started
+            requests = server.requests
+
+        # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_rss_mb = peak_rss / 1024 / 1024 if sys.platform == "darwin" else peak_rss / 1024
+
+        parse_ms, parse_kb = _parse_cost(scraper, archive, max_pages, scraper._parse_product_details)
+        soup_parse_ms, soup_parse_kb = _parse_cost(scraper, archive, max_pages, scraper._parse_product_details_soup)
+
+    return {
+        "publisher": scraper_cls.PUBLISHER,
+        "engine": engine,
+        "requests": requests,
+        "products": sum(len(products) for products in franchises.values()),
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(requests / seconds, 2) if seconds else 0.0,
+        "parse_ms_per_page": round(parse_ms, 3),
+        "parse_kb_per_page": round(parse_kb, 1),
+        "soup_parse_ms_per_page": round(soup_parse_ms, 3),
+        "soup_parse_kb_per_page": round(soup_parse_kb, 1),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+
+def _parse_cost(
+    scraper: BaseScraper,
+    archive: FixtureArchive,
+    max_pages: int,
+    parse_details: Callable
+) -> Tuple[float, float]:
+    """
+    Parse every archived page on a single thread, product pages with parse_details
+
+    Returns:
+        Mean parse time in milliseconds and mean peak allocation in KiB per page
+    """
+    listing_keys = {FixtureArchive.key(scraper._listing_url(page)) for page in range(1, max_pages + 1)}
+
+    def parse(key: str, content: str) -> None:
+        if key in listing_keys:
+            scraper._parse_product_links(content)
+        else:
+            parse_details(scraper.BASE_URL + key, content)
+
+    # robots.txt and sitemaps are recorded too, but are not parsed as HTML
+    html_pages = {key: content for key, content in archive.pages.items() if not key.endswith((".txt", ".xml"))}
+    pages = max(len(html_pages), 1)
+    with redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for key, content in html_pages.items():
+            parse(key, content)
+        seconds = time.perf_counter() - started
+
+        # Tracing slows parsing down, so allocations are measured in a second pass
+        allocated = 0
+        tracemalloc.start()
+        try:
+            for key, content in html_pages.items():
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                parse(key, content)
+                allocated += tracemalloc.get_traced_memory()[1] - before
+        finally:
+            tracemalloc.stop()
+    return seconds * 1000 / pages, allocated / 1024 / pages
+
+
+def run_isolated(function, *args, **kwargs):
+    """Run a function in a freshly spawned process and return its result"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(function, *args, **kwargs).result()
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of a single host.
+
+    Closed, it passes every request and keeps the outcome of the last `window` ones.
+    Once at least `min_requests` of them are known and `failure_rate` of them failed it
+    opens: requests are refused without being sent. After `reset_seconds` it is half
+    open and lets a single probe through, which closes it again on success and reopens
+    it on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_requests: int = 5, reset_seconds: float = 30.0):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if not 1 <= min_requests <= window:
+            raise ValueError("min_requests must be between 1 and window")
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def configure(self, failure_rate: float, window: int, min_requests: int, reset_seconds: float) -> None:
+        with self._lock:
+            self.failure_rate = failure_rate
+            self.min_requests = min_requests
+            self.reset_seconds = reset_seconds
+            if window != self._outcomes.maxlen:
+                self._outcomes = deque(self._outcomes, maxlen=window)
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent, turning an expired open circuit half open"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, failed: bool) -> bool:
+        """
+        Record the outcome of a request that allow() let through
+
+        Returns:
+            True if this outcome opened the circuit
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                    return True
+                self.state = self.CLOSED
+                self._outcomes.clear()
+                return False
+            if self.state == self.OPEN:
+                # Sent before the circuit opened
+                return False
+
+            self._outcomes.append(failed)
+            failures = sum(self._outcomes)
+            if len(self._outcomes) >= self.min_requests and failures >= self.failure_rate * len(self._outcomes):
+                self._open()
+                return True
+            return False
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(host: str, failure_rate: float, window: int, min_requests: int, reset_seconds: float) -> CircuitBreaker:
+    """
+    Return the process-wide circuit breaker of a host, creating or reconfiguring it as needed.
+
+    Shared by all scraper instances, so a host that went down is skipped by every
+    scraper talking to it, while the hosts of other publishers are not affected.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(failure_rate, window, min_requests, reset_seconds)
+        else:
+            breaker.configure(failure_rate, window, min_requests, reset_seconds)
+        return breaker
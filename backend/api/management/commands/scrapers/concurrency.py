@@ -0,0 +1,170 @@
+from collections import deque
+import asyncio
+import threading
+from typing import Deque, Dict, Optional, Tuple
+
+# Responses telling that the host is overloaded
+OVERLOAD_STATUSES = (429, 503)
+
+
+class AdaptiveLimit:
+    """
+    Limit of the requests in flight to a single host, adjusted by additive increase,
+    multiplicative decrease (AIMD).
+
+    A request answered without a 429 or 503 while the smoothed latency stays flat raises
+    the limit by 1/limit, i.e. by one per round of requests. An overloaded response, a
+    failed request or a smoothed latency above LATENCY_TOLERANCE times the baseline halves
+    it. Requests already in flight when the limit was cut do not cut it again, so a burst
+    of 429s halves it only once.
+
+    Coroutines waiting for a slot are queued and handed freed slots in arrival order.
+    """
+
+    LATENCY_TOLERANCE = 2.0
+    # Latencies this close to the baseline count as flat, whatever their ratio
+    LATENCY_SLACK = 0.05
+    # Weight of a new sample in the smoothed latency
+    SMOOTHING = 0.2
+    # Growth of the baseline per sample, so it follows a host that got slower for good
+    BASELINE_DRIFT = 0.01
+    DECREASE_FACTOR = 0.5
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("limits must satisfy 1 <= minimum <= initial <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._decreases = 0
+        self._baseline: Optional[float] = None
+        self._smoothed: Optional[float] = None
+        self._condition = threading.Condition()
+        # Waiting coroutines with their event loop, oldest first
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    def configure(self, maximum: int) -> None:
+        """Change the upper bound, lowering the current limit if it exceeds it"""
+        if maximum < self.minimum:
+            raise ValueError("maximum must not be below minimum")
+        with self._condition:
+            self.maximum = maximum
+            self.limit = min(self.limit, float(maximum))
+
+    def try_acquire(self) -> Optional[int]:
+        """Take a slot if one is free, returning the ticket to release it with or None"""
+        with self._condition:
+            if self._waiters or self.in_flight >= int(self.limit):
+                return None
+            self.in_flight += 1
+            return self._decreases
+
+    def acquire(self) -> int:
+        """Block the calling thread until a slot is free and return the ticket to release it with"""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            return self._decreases
+
+    async def acquire_async(self) -> int:
+        """
+        Suspend the calling coroutine until a slot is free and return the ticket to release it with.
+        Waiting costs nothing until release() hands the coroutine a slot.
+        """
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return self._decreases
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            return await waiter[1]
+        except asyncio.CancelledError:
+            with self._condition:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    waiter = None
+            if waiter and waiter[1].done() and not waiter[1].cancelled():
+                # Handed a slot, but cancelled before it resumed
+                self._return_slot()
+            raise
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to the longest waiting coroutines, called with the condition held"""
+        while self._waiters and self.in_flight < int(self.limit):
+            loop, future = self._waiters.popleft()
+            if loop.is_closed():
+                continue
+            # The slot is taken on the waiter's behalf, so nothing can overtake it before it resumes
+            self.in_flight += 1
+            loop.call_soon_threadsafe(self._hand_over, future, self._decreases)
+
+    def _hand_over(self, future: asyncio.Future, ticket: int) -> None:
+        """Resume a waiting coroutine on its event loop, or free its slot if it was cancelled meanwhile"""
+        if future.cancelled():
+            self._return_slot()
+        else:
+            future.set_result(ticket)
+
+    def _return_slot(self) -> None:
+        """Free a slot that was never used for a request, leaving the limit as it is"""
+        with self._condition:
+            self.in_flight -= 1
+            self._wake_waiters()
+            self._condition.notify_all()
+
+    def release(self, ticket: int, latency: Optional[float], overloaded: bool) -> None:
+        """
+        Free a slot and adjust the limit to the outcome of its request
+
+        Args:
+            ticket: Returned when the slot was acquired
+            latency: Seconds the request took, None if it is no clean sample of the
+                round trip, e.g. because it includes retries
+            overloaded: The host answered 429 or 503, or the request failed
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if latency is not None and not overloaded:
+                if self._baseline is None:
+                    self._baseline = self._smoothed = latency
+                else:
+                    self._baseline = min(latency, self._baseline * (1 + self.BASELINE_DRIFT))
+                    self._smoothed += self.SMOOTHING * (latency - self._smoothed)
+                overloaded = self._smoothed > max(
+                    self._baseline * self.LATENCY_TOLERANCE, self._baseline + self.LATENCY_SLACK
+                )
+
+            if overloaded:
+                if ticket == self._decreases:
+                    self.limit = max(float(self.minimum), self.limit * self.DECREASE_FACTOR)
+                    self._decreases += 1
+                    # Latency is judged afresh at the lower limit
+                    self._smoothed = self._baseline
+            elif latency is not None:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._wake_waiters()
+            self._condition.notify_all()
+
+
+_limits: Dict[str, AdaptiveLimit] = {}
+_limits_lock = threading.Lock()
+
+
+def get_limit(host: str, initial: int, maximum: int) -> AdaptiveLimit:
+    """
+    Return the process-wide concurrency limit of a host, creating it as needed.
+
+    Like the token buckets, the limit is shared by all threads and scraper instances
+    talking to the host, so what was learned about it carries over between scrapes.
+    """
+    with _limits_lock:
+        limit = _limits.get(host)
+        if limit is None:
+            limit = _limits[host] = AdaptiveLimit(min(initial, maximum), maximum)
+        elif limit.maximum != maximum:
+            limit.configure(maximum)
+        return limit
@@ -0,0 +1,206 @@
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+import sqlite3
+import threading
+import time
+
+
+class CrawlFrontier:
+    """
+    Durable state of a publisher crawl, stored in a SQLite file.
+
+    Tracks the last listing page that was queued and every product URL found on the
+    listings with its status (pending, done or failed) and number of failed attempts.
+    A product URL only becomes done once its product was checkpointed by the consumer,
+    so an interrupted run can be resumed without losing or repeating work.
+
+    Also remembers when the last complete sitemap discovery of the crawl started, which
+    is kept across runs.
+    """
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+    # Failed downloads are retried on resume until they failed this often
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, path: Path, crawl: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.crawl = crawl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl TEXT PRIMARY KEY,
+                last_page INTEGER,
+                exhausted INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                crawl TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                isbn TEXT,
+                PRIMARY KEY (crawl, url)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS discoveries (
+                crawl TEXT PRIMARY KEY,
+                started_at REAL,
+                completed_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def reset(self) -> None:
+        """Forget the previous run of this crawl and note when the new one starts"""
+        with self._lock:
+            self._conn.execute("DELETE FROM urls WHERE crawl = ?", (self.crawl,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawls (crawl, last_page, exhausted) VALUES (?, NULL, 0)", (self.crawl,)
+            )
+            self._conn.execute(
+                """
+                INSERT INTO discoveries (crawl, started_at) VALUES (?, ?)
+                ON CONFLICT (crawl) DO UPDATE SET started_at = excluded.started_at
+                """,
+                (self.crawl, time.time())
+            )
+            self._conn.commit()
+
+    def last_discovery(self) -> Optional[float]:
+        """Start time of the last run that walked the whole sitemap, None if there was none"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completed_at FROM discoveries WHERE crawl = ?", (self.crawl,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def complete_discovery(self) -> None:
+        """Record that the current run walked the whole sitemap"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE discoveries SET completed_at = started_at WHERE crawl = ?", (self.crawl,)
+            )
+            self._conn.commit()
+
+    def listing_state(self) -> Tuple[Optional[int], bool]:
+        """
+        Returns:
+            Last listing page whose product URLs were recorded, and whether the listing
+            pages were walked to their end
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_page, exhausted FROM crawls WHERE crawl = ?", (self.crawl,)
+            ).fetchone()
+        if row is None:
+            return None, False
+        return row[0], bool(row[1])
+
+    def pending_urls(self) -> List[str]:
+        with self._lock:
+            return [
+                url for url, in self._conn.execute(
+                    "SELECT url FROM urls WHERE crawl = ? AND status = ? ORDER BY rowid",
+                    (self.crawl, self.PENDING)
+                )
+            ]
+
+    def seen_isbns(self) -> Set[str]:
+        """ISBNs of the products that were already checkpointed"""
+        with self._lock:
+            return {
+                isbn for isbn, in self._conn.execute(
+                    "SELECT isbn FROM urls WHERE crawl = ? AND status = ? AND isbn IS NOT NULL",
+                    (self.crawl, self.DONE)
+                )
+            }
+
+    def record_listing_page(self, page: int, urls: Iterable[str]) -> None:
+        """Add the product URLs of a listing page as pending and remember the page as queued"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO urls (crawl, url, status) VALUES (?, ?, ?)",
+                [(self.crawl, url, self.PENDING) for url in urls]
+            )
+            self._conn.execute("UPDATE crawls SET last_page = ? WHERE crawl = ?", (page, self.crawl))
+            self._conn.commit()
+
+    def add_urls(self, urls: Iterable[str]) -> List[str]:
+        """
+        Add product URLs as pending
+
+        Returns:
+            The URLs that were not part of the crawl yet
+        """
+        added = []
+        with self._lock:
+            for url in urls:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO urls (crawl, url, status) VALUES (?, ?, ?)",
+                    (self.crawl, url, self.PENDING)
+                )
+                if cursor.rowcount:
+                    added.append(url)
+            self._conn.commit()
+        return added
+
+    def mark_exhausted(self) -> None:
+        """Record that no further listing pages need to be fetched"""
+        with self._lock:
+            self._conn.execute("UPDATE crawls SET exhausted = 1 WHERE crawl = ?", (self.crawl,))
+            self._conn.commit()
+
+    def mark_done(self, urls: Iterable[Tuple[str, Optional[str]]]) -> None:
+        """
+        Args:
+            urls: Product URLs that need no further work, with the ISBN that was stored
+                for them, or None if the page held no storable product
+        """
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE urls SET status = ?, isbn = ? WHERE crawl = ? AND url = ?",
+                [(self.DONE, isbn, self.crawl, url) for url, isbn in urls]
+            )
+            self._conn.commit()
+
+    def record_failure(self, url: str) -> None:
+        """Count a failed attempt, giving the URL up once it failed MAX_ATTEMPTS times"""
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE urls SET
+                    attempts = attempts + 1,
+                    status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END
+                WHERE crawl = ? AND url = ?
+                """,
+                (self.MAX_ATTEMPTS, self.FAILED, self.PENDING, self.crawl, url)
+            )
+            self._conn.commit()
+
+    def failed_urls(self) -> List[str]:
+        """Product URLs whose download failed at least once and that were not checkpointed since"""
+        with self._lock:
+            return [
+                url for url, in self._conn.execute(
+                    "SELECT url FROM urls WHERE crawl = ? AND attempts > 0 AND status != ? ORDER BY rowid",
+                    (self.crawl, self.DONE)
+                )
+            ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+import sqlite3
+import threading
+import time
+
+
+@dataclass
+class CachedResponse:
+    """Cached page body together with the validators needed to revalidate it"""
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    validated_at: float
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers turning a GET for this entry into a conditional request"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache keyed by URL, stored in a single SQLite file.
+
+    Entries keep their ETag/Last-Modified so they can be revalidated with a conditional
+    request. The total body size is capped at max_bytes by evicting the least recently
+    used entries.
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                validated_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached entry of a URL and mark it as recently used"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, validated_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return CachedResponse(*row)
+
+    def store(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Store a fresh response and evict old entries if the cache outgrew max_bytes"""
+        size = len(body.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def mark_validated(self, url: str) -> None:
+        """Record that the server confirmed the cached entry is still current (304)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET validated_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM entries ORDER BY accessed_at"
+        ).fetchall():
+            self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,244 @@
+from bisect import bisect_left
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import json
+import threading
+import time
+
+# Upper bounds of the histogram buckets, in seconds and bytes
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Counts of observations per bucket, with sum, minimum and maximum"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        # The last bucket counts everything above the largest bound
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile, the maximum for the overflow bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "min": _round(self.min),
+            "max": _round(self.max),
+            "mean": _round(self.total / self.count) if self.count else None,
+            "p50": _round(self.quantile(0.5)),
+            "p95": _round(self.quantile(0.95)),
+            "buckets": {
+                **{str(bound): count for bound, count in zip(self.bounds, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 6)
+
+
+class HostMetrics:
+    """Request statistics of one host"""
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.throttle_wait = Histogram(LATENCY_BUCKETS)
+        self.statuses: Counter = Counter()
+        self.retries = 0
+        self.errors = 0
+        self.cache_hits = 0
+        # Requests refused without being sent, as the circuit breaker of the host was open
+        self.short_circuited = 0
+        # Adaptive concurrency limit at the end of the run and the highest it reached
+        self.concurrency_limit: Optional[float] = None
+        self.max_concurrency_limit: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.latency.count,
+            "latency_seconds": self.latency.to_dict(),
+            "response_bytes": self.response_bytes.to_dict(),
+            "throttle_wait_seconds": self.throttle_wait.to_dict(),
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            "retries": self.retries,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "short_circuited": self.short_circuited,
+            "concurrency_limit": _round(self.concurrency_limit),
+            "max_concurrency_limit": _round(self.max_concurrency_limit),
+        }
+
+
+class ScrapeMetrics:
+    """
+    Thread-safe measurements of one scrape run.
+
+    Requests are broken down per host. Queue wait covers the time product URLs spend
+    in the frontier queue before a worker takes them, parse time is kept per page kind.
+    """
+
+    def __init__(self, publisher: str):
+        self.publisher = publisher
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.hosts: Dict[str, HostMetrics] = {}
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+        self.parse_time: Dict[str, Histogram] = {}
+        self.products = 0
+        self.retries_spent = 0
+        self.retries_denied = 0
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> HostMetrics:
+        metrics = self.hosts.get(host)
+        if metrics is None:
+            metrics = self.hosts[host] = HostMetrics()
+        return metrics
+
+    def record_request(
+        self,
+        host: str,
+        seconds: float,
+        status: Optional[int],
+        size: int = 0,
+        retries: int = 0
+    ) -> None:
+        """
+        Args:
+            host: Host the request went to
+            seconds: Time until the final response, including retries
+            status: Status of the final response, None if the request failed without one
+            size: Bytes of the response body
+            retries: Retries that were needed
+        """
+        with self._lock:
+            metrics = self._host(host)
+            metrics.latency.observe(seconds)
+            metrics.statuses[status if status is not None else "error"] += 1
+            metrics.retries += retries
+            if status is None or status >= 400:
+                metrics.errors += 1
+            else:
+                metrics.response_bytes.observe(size)
+
+    def record_cache_hit(self, host: str) -> None:
+        with self._lock:
+            self._host(host).cache_hits += 1
+
+    def record_short_circuit(self, host: str) -> None:
+        with self._lock:
+            self._host(host).short_circuited += 1
+
+    def record_throttle(self, host: str, seconds: float) -> None:
+        with self._lock:
+            self._host(host).throttle_wait.observe(seconds)
+
+    def record_concurrency(self, host: str, limit: float) -> None:
+        with self._lock:
+            metrics = self._host(host)
+            metrics.concurrency_limit = limit
+            metrics.max_concurrency_limit = max(limit, metrics.max_concurrency_limit or limit)
+
+    def record_queue_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.queue_wait.observe(seconds)
+
+    def record_parse(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.parse_time.get(kind)
+            if histogram is None:
+                histogram = self.parse_time[kind] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def record_product(self) -> None:
+        with self._lock:
+            self.products += 1
+
+    def record_retry_budget(self, spent: int, denied: int) -> None:
+        """Record the retries the run took from its retry budget and the ones it was refused"""
+        with self._lock:
+            self.retries_spent = spent
+            self.retries_denied = denied
+
+    def finish(self) -> None:
+        self.finished_at = time.time()
+
+    def summary(self) -> Dict:
+        """JSON-serializable summary of the run"""
+        with self._lock:
+            finished_at = self.finished_at or time.time()
+            return {
+                "publisher": self.publisher,
+                "started_at": self.started_at,
+                "finished_at": finished_at,
+                "seconds": round(finished_at - self.started_at, 3),
+                "products": self.products,
+                "retry_budget": {"spent": self.retries_spent, "denied": self.retries_denied},
+                "hosts": {host: metrics.to_dict() for host, metrics in sorted(self.hosts.items())},
+                "queue_wait_seconds": self.queue_wait.to_dict(),
+                "parse_seconds": {kind: histogram.to_dict() for kind, histogram in sorted(self.parse_time.items())},
+            }
+
+    def summary_line(self) -> str:
+        """One-line overview of where the run spent its time"""
+        return format_summary(self.summary())
+
+    def save(self, directory: Path) -> Path:
+        """Write the summary as <publisher>-<start time>.json and return its path"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(self.started_at))
+        stamp += f"{self.started_at % 1:.3f}"[1:]
+        path = directory / f"{self.publisher.lower() or 'scraper'}-{stamp}.json"
+        path.write_text(json.dumps(self.summary(), indent=2))
+        return path
+
+
+def load_summaries(directory: Path, publisher: Optional[str] = None) -> List[Dict]:
+    """Saved run summaries, oldest first, optionally of one publisher only"""
+    pattern = f"{publisher.lower()}-*.json" if publisher else "*.json"
+    summaries = [json.loads(path.read_text()) for path in Path(directory).glob(pattern)]
+    return sorted(summaries, key=lambda summary: summary["started_at"])
+
+
+def format_summary(summary: Dict) -> str:
+    """One-line overview of a run summary, as returned by ScrapeMetrics.summary"""
+    hosts = summary["hosts"].values()
+    network = sum(host["latency_seconds"]["sum"] for host in hosts)
+    throttled = sum(host["throttle_wait_seconds"]["sum"] for host in hosts)
+    parsing = sum(kind["sum"] for kind in summary["parse_seconds"].values())
+    # Times are summed over all workers, so they can exceed the duration of the run
+    return (
+        f"{summary['publisher']}: {summary['products']} products in {summary['seconds']}s, "
+        f"{sum(host['requests'] for host in hosts)} requests "
+        f"({sum(host['errors'] for host in hosts)} failed, {sum(host['retries'] for host in hosts)} retries, "
+        f"{sum(host['cache_hits'] for host in hosts)} cache hits, "
+        f"{sum(host.get('short_circuited', 0) for host in hosts)} refused by the circuit breaker); "
+        f"worker time {network:.1f}s in requests, {throttled:.1f}s throttled, {parsing:.1f}s parsing"
+    )
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Token bucket limiting the request rate to a single host.
+
+    Callers reserve a token under a lock and then sleep until their slot outside of it,
+    so waiting threads and coroutines are served in arrival order at exactly `rate`
+    requests per second once the initial `burst` is used up.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Change rate and burst, keeping the tokens already accumulated"""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            self.burst = burst
+            self._tokens = min(self._tokens, float(burst))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self) -> float:
+        """
+        Take one token, going into debt if none is available
+
+        Returns:
+            Seconds the caller has to wait before sending its request
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block the calling thread until a token is available and return the seconds waited"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Suspend the calling coroutine until a token is available and return the seconds waited"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(host: str, rate: float, burst: int) -> TokenBucket:
+    """
+    Return the process-wide bucket of a host, creating or reconfiguring it as needed.
+
+    All threads and scraper instances talking to the same host share one bucket,
+    so running several scrapers for one publisher never multiplies its rate.
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = _buckets[host] = TokenBucket(rate, burst)
+        elif bucket.rate != rate or bucket.burst != burst:
+            bucket.configure(rate, burst)
+        return bucket
@@ -0,0 +1,30 @@
+from pathlib import Path
+from typing import Dict, Type
+import importlib
+import pkgutil
+
+from .base_scraper import BaseScraper
+
+
+def load_scrapers() -> Dict[str, Type[BaseScraper]]:
+    """
+    Import every module of the scrapers package and collect the publisher scrapers in it.
+
+    A BaseScraper subclass is registered under the PUBLISHER name it declares itself,
+    so helper subclasses that merely inherit PUBLISHER do not replace the original.
+
+    Returns:
+        Scraper classes by publisher name, sorted by name
+    """
+    package = __name__.rsplit(".", 1)[0]
+    for module in pkgutil.iter_modules([str(Path(__file__).parent)]):
+        importlib.import_module(f"{package}.{module.name}")
+
+    scrapers = {}
+    pending = list(BaseScraper.__subclasses__())
+    while pending:
+        scraper_cls = pending.pop()
+        pending.extend(scraper_cls.__subclasses__())
+        if "PUBLISHER" in vars(scraper_cls):
+            scrapers[scraper_cls.PUBLISHER] = scraper_cls
+    return dict(sorted(scrapers.items()))
@@ -0,0 +1,172 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import zipfile
+
+# Default location of recorded fixture archives, one <publisher>.zip per scraper
+FIXTURE_DIR = Path(__file__).resolve().parents[4] / "scraper_fixtures"
+
+
+class FixtureArchive:
+    """
+    Pages recorded from one publisher site, keyed by path and query.
+
+    Assign an archive to BaseScraper.recorder to capture a live scrape, then save it
+    as a zip file that ReplayServer can serve offline.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, base_url: str, pages: Optional[Dict[str, str]] = None):
+        self.base_url = base_url.rstrip("/")
+        self.pages: Dict[str, str] = pages or {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Host-independent key of a URL, so recordings can be served from any address"""
+        parts = urlsplit(url)
+        return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+    def add(self, url: str, content: str) -> None:
+        with self._lock:
+            self.pages[self.key(url)] = content
+
+    def get(self, key: str) -> Optional[str]:
+        return self.pages.get(key)
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def save(self, path: Path) -> None:
+        """Write the archive as a zip file with one member per page"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entries = {}
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for key, content in sorted(self.pages.items()):
+                member = "pages/" + hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html"
+                archive.writestr(member, content)
+                entries[key] = member
+            archive.writestr(self.MANIFEST, json.dumps({
+                "base_url": self.base_url,
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "entries": entries
+            }, indent=2))
+
+    @classmethod
+    def load(cls, path: Path) -> "FixtureArchive":
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read(cls.MANIFEST))
+            pages = {
+                key: archive.read(member).decode("utf-8")
+                for key, member in manifest["entries"].items()
+            }
+        return cls(manifest["base_url"], pages)
+
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections at the end of a run are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class ReplayServer:
+    """
+    Local HTTP stand-in serving a FixtureArchive.
+
+    Links to the recorded site are rewritten to the server's own address. Unrecorded
+    URLs answer 404, which ends pagination like an empty listing page would.
+
+    Args:
+        archive: Recorded pages to serve
+        latency: Seconds every response is delayed by
+        error_rate: Share of requests answered with error_status instead of the page
+        error_status: HTTP status of injected errors
+        seed: Seed of the error injection, so runs are reproducible
+    """
+
+    def __init__(
+        self,
+        archive: FixtureArchive,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0
+    ):
+        self.archive = archive
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        # Arrival time, client port and key of every request, e.g. to check pacing and connection reuse
+        self.log: List[Tuple[float, int, str]] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.url = ""
+
+    def __enter__(self) -> "ReplayServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL to scrape"""
+        self._server = _ReplayHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _respond(self, key: str):
+        """Return status and body for a request, applying latency and error injection"""
+        with self._lock:
+            self.requests += 1
+            inject_error = self.error_rate and self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if inject_error:
+            return self.error_status, b""
+        content = self.archive.get(key)
+        if content is None:
+            return 404, b""
+        return 200, content.replace(self.archive.base_url, self.url).encode("utf-8")
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server._lock:
+                    server.log.append((time.monotonic(), self.client_address[1], self.path))
+                status, body = server._respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
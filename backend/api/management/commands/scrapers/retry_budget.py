@@ -0,0 +1,62 @@
+import threading
+from typing import Optional
+
+from urllib3 import Retry
+from urllib3.exceptions import MaxRetryError, ResponseError
+
+
+class RetryBudget:
+    """
+    Retries allowed during one scrape run: `minimum` plus `ratio` of the requests sent.
+
+    Retries help against a few flaky responses, but against a failing host they only
+    multiply the requests and backoff sleeps. Once the budget is spent, failed requests
+    fail right away. Retries of 429 responses are not charged, the host is up and only
+    asks to slow down, which the adaptive concurrency limit takes care of.
+    """
+
+    def __init__(self, minimum: int = 10, ratio: float = 0.1):
+        self.minimum = minimum
+        self.ratio = ratio
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start the budget of a new run"""
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.denied = 0
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget, returning False if none is left"""
+        with self._lock:
+            if self.retries >= self.minimum + self.ratio * self.requests:
+                self.denied += 1
+                return False
+            self.retries += 1
+            return True
+
+
+class BudgetedRetry(Retry):
+    """urllib3 Retry that also gives up once the RetryBudget of the run is spent"""
+
+    def __init__(self, *args, budget: Optional[RetryBudget] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+
+    def new(self, **kw) -> "BudgetedRetry":
+        kw.setdefault("budget", self.budget)
+        return super().new(**kw)
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None) -> "BudgetedRetry":
+        # Raises MaxRetryError on its own if the retries of the request are used up
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        too_many_requests = response is not None and response.status == 429
+        if self.budget is not None and not too_many_requests and not self.budget.try_spend():
+            raise MaxRetryError(_pool, url, error or ResponseError("retry budget of the run is spent"))
+        return retry
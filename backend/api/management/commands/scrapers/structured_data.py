@@ -0,0 +1,149 @@
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Dict, List, Optional
+import json
+import re
+
+# Tags carrying OpenGraph or microdata attributes, the regex engine skips everything else
+_ANNOTATED_TAG = re.compile(r"<([a-zA-Z][\w-]*)\s([^>]*?\b(?:property|itemprop)\s*=[^>]*)>")
+_ATTRIBUTE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_JSON_LD = re.compile(r"<script[^>]*application/ld\+json[^>]*>(.*?)</script>", re.S | re.I)
+# Label and value of a Shopware product--base-info entry
+_BASE_INFO_ENTRY = re.compile(
+    r"""class="[^"]*\bentry--label\b[^"]*"[^>]*>(.*?)</strong>\s*"""
+    r"""<span[^>]*class="[^"]*\bentry--content\b[^"]*"[^>]*>(.*?)</span>""",
+    re.S
+)
+# Start tag of the Shopware product title and description, and the srcset of the product image
+_PRODUCT_REGION = re.compile(
+    r"""<(h1|div)\s[^>]*?class="(?:[^"]*\s)?(product--title|product--description)(?:\s[^"]*)?"[^>]*>"""
+)
+_PRODUCT_IMAGE = re.compile(
+    r"""<a\s[^>]*?class="(?:[^"]*\s)?product--image(?:\s[^"]*)?"[^>]*>"""
+    r"""(?:(?!</a>).)*?<img\s[^>]*?srcset="([^"]*)""",
+    re.S
+)
+_TAG = re.compile(r"<[^>]+>")
+_VOID_TAGS = {"meta", "link", "img", "input", "br", "hr", "source"}
+# schema.org properties and the OpenGraph tags holding the same value
+_OPEN_GRAPH = {"name": "og:title", "description": "og:description", "image": "og:image"}
+_PRODUCT_TYPES = {"Product", "Book", "IndividualProduct"}
+
+_closing_patterns: Dict[str, re.Pattern] = {}
+
+
+@dataclass(slots=True)
+class StructuredData:
+    """Machine-readable fields of a product page"""
+    open_graph: Dict[str, str] = field(default_factory=dict)
+    microdata: Dict[str, str] = field(default_factory=dict)
+    json_ld: List[Dict] = field(default_factory=list)
+    # Shopware product--base-info entries, label without the trailing colon to value
+    base_info: Dict[str, str] = field(default_factory=dict)
+    # Shopware product regions by class: text of the product--title heading and the
+    # product--description, first srcset entry of the product--image
+    regions: Dict[str, str] = field(default_factory=dict)
+
+    def get(self, name: str) -> Optional[str]:
+        """
+        Look up a schema.org product property in OpenGraph, JSON-LD and microdata, in that order.
+        OpenGraph comes first as the soup parsers read it, microdata last as its properties
+        are not scoped to the product here
+
+        Returns:
+            The first non-empty value, None if no source has one
+        """
+        og_name = _OPEN_GRAPH.get(name)
+        if og_name and self.open_graph.get(og_name):
+            return self.open_graph[og_name]
+        for item in self.json_ld:
+            if item.get(name) and _is_product(item):
+                value = item[name]
+                if isinstance(value, list):
+                    value = value[0]
+                if isinstance(value, dict):
+                    value = value.get("url") or value.get("name")
+                if value:
+                    return str(value).strip()
+        return self.microdata.get(name) or None
+
+
+def extract_structured_data(html: str) -> StructuredData:
+    """
+    Collect OpenGraph, microdata, JSON-LD and Shopware base-info and product region fields
+    from the raw HTML, without building a document tree. The first value of a field wins.
+    """
+    data = StructuredData()
+
+    for match in _ANNOTATED_TAG.finditer(html):
+        tag = match.group(1).lower()
+        attributes = {
+            name.lower(): unescape(next(value for value in values if value is not None))
+            for name, *values in _ATTRIBUTE.findall(match.group(2))
+        }
+        og_name = attributes.get("property")
+        if og_name and og_name.startswith("og:") and "content" in attributes:
+            data.open_graph.setdefault(og_name, attributes["content"].strip())
+        itemprop = attributes.get("itemprop")
+        if itemprop and itemprop not in data.microdata:
+            value = attributes.get("content") or attributes.get("href") or attributes.get("src")
+            if value is None and tag not in _VOID_TAGS:
+                value = _element_text(html, tag, match.end())
+            if value:
+                data.microdata[itemprop] = value.strip()
+
+    for block in _JSON_LD.findall(html):
+        try:
+            document = json.loads(block)
+        except ValueError:
+            continue
+        data.json_ld.extend(_json_ld_items(document))
+
+    for label, value in _BASE_INFO_ENTRY.findall(html):
+        label = _strip_tags(label).rstrip(":").strip()
+        data.base_info.setdefault(label, _strip_tags(value))
+
+    for match in _PRODUCT_REGION.finditer(html):
+        if match.group(2) not in data.regions:
+            text = _element_text(html, match.group(1), match.end())
+            if text is not None:
+                data.regions[match.group(2)] = text
+    image = _PRODUCT_IMAGE.search(html)
+    if image:
+        data.regions["product--image"] = unescape(image.group(1).split(",")[0].strip())
+
+    return data
+
+
+def _element_text(html: str, tag: str, start: int) -> Optional[str]:
+    """Text content of the element whose start tag ends at start, None if it is not closed"""
+    pattern = _closing_patterns.get(tag)
+    if pattern is None:
+        pattern = _closing_patterns[tag] = re.compile(rf"<(/?){tag}\b[^>]*>", re.I)
+    depth = 1
+    for match in pattern.finditer(html, start):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            return _strip_tags(html[start:match.start()])
+    return None
+
+
+def _strip_tags(fragment: str) -> str:
+    return unescape(_TAG.sub("", fragment)).strip()
+
+
+def _json_ld_items(document) -> List[Dict]:
+    """Flatten a JSON-LD document, including @graph containers, into its objects"""
+    if isinstance(document, list):
+        return [item for element in document for item in _json_ld_items(element)]
+    if not isinstance(document, dict):
+        return []
+    if "@graph" in document:
+        return _json_ld_items(document["@graph"])
+    return [document]
+
+
+def _is_product(item: Dict) -> bool:
+    types = item.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(product_type in _PRODUCT_TYPES for product_type in types)
@@ -1,12 +1,24 @@
 from concurrent.futures import ThreadPoolExecutor
 import time
 from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
-from .base_scraper import BaseScraper, ProductInfo
+from .base_scraper import BaseScraper, ProductInfo, has_class
+from .structured_data import StructuredData
 
 class TokyopopScraper(BaseScraper):
     BASE_URL = "https://www.tokyopop.de"
+    PUBLISHER = "Tokyopop"
+    REQUESTS_PER_SECOND = 2.0
+    BURST = 4
+
+    # Largest page size Shopware offers by default, newest releases first
+    LISTING_PAGE_SIZE = 48
+    LISTING_ORDER = 1
+
+    LISTING_PARSE_ONLY = SoupStrainer("div", class_=has_class("product--info"))
+    # og:/itemprop meta tags and the product--base-info list
+    DETAIL_PARSE_ONLY = SoupStrainer(["meta", "ul"])
     
     def _determine_product_type(self, soup: BeautifulSoup) -> str:
         """Determine product type from product details"""
@@ -18,23 +30,33 @@ class TokyopopScraper(BaseScraper):
                 if label and "Produkt" in label.text:
                     content = entry.find("span", class_="entry--content")
                     if content:
-                        content_text = content.text.strip().upper()
-                        if "MANGA" in content_text:
-                            return "MANGA"
-                        elif "LIGHT NOVEL" in content_text:
-                            return "LIGHT_NOVEL"
-                        elif "WEBTOON" in content_text:
-                            return "WEBTOON"
-                        else:
-                            return "OTHER"
+                        return self._product_type_from_text(content.text)
 
-    def _extract_product_details(self, url: str) -> Optional[ProductInfo]:
-        """Extract all product details from a product page"""
-        content = self._fetch_page(url)
-        if not content:
+    def _parse_structured_data(self, url: str, data: StructuredData) -> Optional[ProductInfo]:
+        """Read the product from the same og: tags, isbn/releaseDate microdata and Produkt entry as the soup parser"""
+        title = data.open_graph.get("og:title")
+        isbn = data.microdata.get("isbn")
+        release_date = self.parse_date((data.microdata.get("releaseDate") or "")[:10])
+        product_kind = data.base_info.get("Produkt")
+        description = data.open_graph.get("og:description")
+        image_url = data.open_graph.get("og:image")
+        if not all((title, isbn, release_date, product_kind, description, image_url)):
             return None
 
-        soup = BeautifulSoup(content, "html.parser")
+        return ProductInfo(
+            title=title,
+            franchise=self._clean_franchise_name(title),
+            isbn=isbn,
+            description=description,
+            image_url=image_url,
+            release_date=release_date,
+            product_type=self._product_type_from_text(product_kind),
+            url=url
+        )
+
+    def _parse_product_details_soup(self, url: str, content: str) -> Optional[ProductInfo]:
+        """Extract all product details from a product page"""
+        soup = self._make_soup(content, self.DETAIL_PARSE_ONLY)
         
         title = self._extract_meta_content(soup, "title")
         description = self._extract_meta_content(soup, "description")
@@ -43,13 +65,13 @@ class TokyopopScraper(BaseScraper):
         isbn_tag = soup.find("meta", attrs={"itemprop": "isbn"})
         isbn = isbn_tag["content"].strip() if isbn_tag else "N/A"
         
-        # Skip if ISBN is invalid or already seen
-        if not self.is_valid_isbn(isbn) or isbn in self._seen_isbns:
+        # Skip if ISBN is invalid
+        if not self.is_valid_isbn(isbn):
             return None
-        self._seen_isbns.add(isbn)
         
         release_date_tag = soup.find("meta", attrs={"itemprop": "releaseDate"})
-        release_date = self.format_date_to_german(release_date_tag["content"]) if release_date_tag else "N/A"
+        # Only the date part, some pages add a time
+        release_date = self.parse_date(release_date_tag["content"][:10]) if release_date_tag else None
         
         franchise = self._clean_franchise_name(title)
         product_type = self._determine_product_type(soup)
@@ -65,14 +87,13 @@ class TokyopopScraper(BaseScraper):
             url=url
         )
 
-    def _get_product_links(self, page: int) -> List[str]:
+    def _listing_url(self, page: int) -> str:
+        """Build the URL of a listing page"""
+        return f"{self.BASE_URL}/buecher/?{self._listing_query(page)}"
+
+    def _parse_product_links(self, content: str) -> List[str]:
         """Extract product links from a listing page"""
-        url = f"{self.BASE_URL}/buecher/?p={page}"
-        content = self._fetch_page(url)
-        if not content:
-            return []
-        
-        soup = BeautifulSoup(content, "html.parser")
+        soup = self._make_soup(content, self.LISTING_PARSE_ONLY)
         links = []
         
         for product in soup.find_all("div", class_="product--info"):
@@ -0,0 +1,66 @@
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+import sqlite3
+import threading
+import time
+
+
+class UrlIsbnIndex:
+    """
+    Persistent map from product page URL to the ISBN found on it.
+
+    Lets incremental runs recognise known products straight from a listing page,
+    without downloading their detail pages again.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS product_urls (
+                url TEXT PRIMARY KEY,
+                isbn TEXT NOT NULL,
+                scraped_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def lookup(self, urls: Iterable[str]) -> Dict[str, Tuple[str, float]]:
+        """
+        Args:
+            urls: Product page URLs
+
+        Returns:
+            ISBN and scrape timestamp of every URL that is already indexed
+        """
+        urls = list(urls)
+        found = {}
+        with self._lock:
+            for i in range(0, len(urls), self.LOOKUP_CHUNK):
+                chunk = urls[i:i + self.LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                for url, isbn, scraped_at in self._conn.execute(
+                    f"SELECT url, isbn, scraped_at FROM product_urls WHERE url IN ({placeholders})", chunk
+                ):
+                    found[url] = (isbn, scraped_at)
+        return found
+
+    def record(self, url: str, isbn: str) -> None:
+        """Remember the ISBN of a product page that was just scraped"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO product_urls VALUES (?, ?, ?)", (url, isbn, time.time())
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,15 +1,31 @@
 from django.db import models
+from django.utils import timezone
 import uuid
 from .constants import PRODUCT_TYPE
 
 
+class CoverImage(models.Model):
+    """Cover image downloaded from a publisher, stored once per distinct content"""
+    digest = models.CharField(primary_key = True, max_length=64, editable = False)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.digest
+
 class Franchise(models.Model):
     id = models.UUIDField(primary_key = True, default = uuid.uuid4, editable = False)
-    title = models.CharField(max_length=100)
+    # Unique, as scraped products are matched to their franchise by title
+    title = models.CharField(max_length=100, unique=True)
     description = models.CharField(max_length=500)
     image = models.CharField(max_length=200)
     is_followed = models.BooleanField(default=False)
 
+    # Local copy of image and the URL it was downloaded from
+    cover = models.ForeignKey(CoverImage, related_name="franchises", null=True, blank=True, on_delete=models.SET_NULL)
+    cover_source = models.CharField(max_length=200, blank=True, default="")
+
 
     def __str__(self):
         return self.title
@@ -20,6 +36,10 @@ class Publisher(models.Model):
     website = models.CharField(max_length=200)
     image = models.CharField(max_length=200)
 
+    class Meta:
+        # Keyset pagination of the publisher list
+        indexes = [models.Index(fields=["name", "id"])]
+
     def __str__(self):
         return self.name
 
@@ -38,6 +58,18 @@ class Product(models.Model):
     publisher = models.ForeignKey(Publisher, related_name="products", on_delete=models.CASCADE)
     is_owned = models.BooleanField(default=False)
 
+    # Local copy of image and the URL it was downloaded from
+    cover = models.ForeignKey(CoverImage, related_name="products", null=True, blank=True, on_delete=models.SET_NULL)
+    cover_source = models.CharField(max_length=200, blank=True, default="")
+
+    # Fingerprint of the scraped fields and the time they last changed, maintained by monthly_update
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        # Keyset pagination of the product list
+        indexes = [models.Index(fields=["release_date", "isbn"])]
+
     def __str__(self):
         return self.title
 
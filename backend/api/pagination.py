@@ -0,0 +1,119 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import List, Optional, Sequence
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the values of the last row of a page.
+
+    A page is fetched with WHERE (a, b) > (last a, last b) ORDER BY a, b LIMIT n, which an
+    index on the ordering columns answers without skipping over the rows before it, so a
+    page costs the same however deep the client scrolls. The ordering must end in a unique
+    column. Pages only go forward, clients follow the next link until it is null.
+
+    Clients that need every row in one response, like before pagination existed, pass
+    ?all=true and get the plain list back.
+    """
+
+    ordering: Sequence[str] = ()
+    page_size = 100
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    full_dump_query_param = 'all'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[List]:
+        if request.query_params.get(self.full_dump_query_param, '').lower() in ('1', 'true', 'yes'):
+            return None
+
+        queryset = queryset.order_by(*self.ordering)
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.after(self.decode_cursor(queryset.model, encoded)))
+
+        # One row more than requested tells whether there is a next page
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        page = rows[:self.page_size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def after(self, values: Sequence) -> Q:
+        """
+        Rows sorting after the given values of the ordering columns, written as
+        a >= x AND (a > x OR (a = x AND b > y)) so the leading bound can seek the index
+        """
+        keys = list(zip(self.ordering, values))
+        field, value = keys[-1]
+        condition = Q(**{f'{field}__gt': value})
+        for field, value in reversed(keys[:-1]):
+            condition = Q(**{f'{field}__gt': value}) | (Q(**{field: value}) & condition)
+        field, value = keys[0]
+        return Q(**{f'{field}__gte': value}) & condition
+
+    def encode_cursor(self, row) -> str:
+        values = [str(getattr(row, field)) for field in self.ordering]
+        return urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, model, encoded: str) -> List:
+        try:
+            values = json.loads(urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(encoded)
+            return [model._meta.get_field(field).to_python(value) for field, value in zip(self.ordering, values)]
+        except (BinasciiError, ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class ProductPagination(KeysetPagination):
+    ordering = ('release_date', 'isbn')
+
+
+class FranchisePagination(KeysetPagination):
+    # Titles are unique, so they order franchises on their own
+    ordering = ('title',)
+
+
+class PublisherPagination(KeysetPagination):
+    ordering = ('name', 'id')
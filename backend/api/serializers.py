@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.urls import reverse
 from rest_framework import serializers
 from datetime import datetime
 from .models import Product, Publisher, Franchise
@@ -19,25 +21,45 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+def cover_thumbnails(serializer, obj):
+    """URLs of the local thumbnails of an object's cover by size name, None until its cover is downloaded"""
+    if not obj.cover_id:
+        return None
+    request = serializer.context.get('request')
+    urls = {}
+    for size in settings.COVER_THUMBNAIL_SIZES:
+        url = reverse('cover-thumbnail', args=[obj.cover_id, size])
+        urls[size] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
 class ProductSerializer(serializers.ModelSerializer):
     release_date = serializers.DateField(format='%d.%m.%Y', input_formats=['%d.%m.%Y'])
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
-        fields = ['isbn', 'title', 'description', 'image', 'release_date', 'type', 'link_to_provider', 'franchise', 'publisher', 'is_owned']
+        fields = ['isbn', 'title', 'description', 'image', 'thumbnails', 'release_date', 'type', 'link_to_provider', 'franchise', 'publisher', 'is_owned']
         extra_kwargs = {}
 
+    def get_thumbnails(self, obj):
+        return cover_thumbnails(self, obj)
+
 
 class FranchiseSerializer(serializers.ModelSerializer):
     products = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = Franchise
-        fields = ["id", "title", "description", "image", "products", "is_followed"]
+        fields = ["id", "title", "description", "image", "thumbnails", "products", "is_followed"]
 
     def get_products(self, obj):
         return [product.isbn for product in obj.products.all()]
 
+    def get_thumbnails(self, obj):
+        return cover_thumbnails(self, obj)
+
 
 class PublisherSerializer(serializers.ModelSerializer):
     class Meta:
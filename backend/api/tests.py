@@ -1,3 +1,685 @@
-from django.test import TestCase
+from collections import Counter
+from contextlib import redirect_stdout
+from datetime import date
+from pathlib import Path
+from unittest import mock, skipUnless
+import asyncio
+import io
+import tempfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission, User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import CharField
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from .covers import store_cover, thumbnail_path
+from .management.commands.download_covers import Command as DownloadCoversCommand
+from .management.commands.monthly_update import Command as MonthlyUpdateCommand
+from .management.commands.scrapers.altraverse import AltraverseScraper
+from .management.commands.scrapers.base_scraper import BaseScraper, ProductInfo
+from .management.commands.scrapers.concurrency import AdaptiveLimit
+from .management.commands.scrapers.registry import load_scrapers
+from .management.commands.scrapers.replay import FIXTURE_DIR, FixtureArchive, ReplayServer
+from .management.commands.scrapers.structured_data import extract_structured_data
+from .models import CoverImage, Franchise, Product, Publisher
+
+
+class ListQueryCountTests(TestCase):
+    """
+    The list endpoints fetch related products in a constant number of queries,
+    however many franchises and publishers they return
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_catalog(self, franchises, products_per_franchise=3):
+        publishers = Publisher.objects.bulk_create([
+            Publisher(name=f'Publisher {index}', website='https://example.com', image='') for index in range(2)
+        ])
+        created = Franchise.objects.bulk_create([
+            Franchise(title=f'Franchise {index:03d}', description='', image='') for index in range(franchises)
+        ])
+        Product.objects.bulk_create([
+            Product(
+                isbn=f'978-3-{index:04d}-{volume:04d}-0',
+                title=f'{franchise.title}, Band {volume:02d}',
+                description='',
+                image='',
+                link_to_provider='',
+                release_date=date(2024, 1, volume + 1),
+                franchise=franchise,
+                publisher=publishers[index % len(publishers)],
+            )
+            for index, franchise in enumerate(created)
+            for volume in range(products_per_franchise)
+        ])
+
+    def test_franchise_list_queries_do_not_grow_with_franchises(self):
+        self.create_catalog(franchises=30)
+        # One query for the page of franchises, one for the ISBNs of their products
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('franchise-list'), {'page_size': 20})
+        self.assertEqual(len(response.json()['results']), 20)
+        self.assertEqual(len(response.json()['results'][0]['products']), 3)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_franchise_full_dump_queries_do_not_grow_with_franchises(self):
+        self.create_catalog(franchises=30)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('franchise-list'), {'all': 'true'})
+        self.assertEqual(len(response.json()), 30)
+        self.assertEqual(sum(len(franchise['products']) for franchise in response.json()), 90)
+
+    def test_publisher_list_queries_do_not_grow_with_products(self):
+        self.create_catalog(franchises=10)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('publisher-list'), {'all': 'true'})
+        self.assertEqual(sorted(len(publisher['products']) for publisher in response.json()), [15, 15])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('publisher-list'))
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_admin_franchise_list_queries_do_not_grow_with_franchises(self):
+        self.create_catalog(franchises=10)
+        self.client.force_authenticate(User(username='admin', is_staff=True))
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('create-write-franchise-list'))
+        self.assertEqual(len(response.json()), 10)
+
+    def test_product_list_is_one_query(self):
+        self.create_catalog(franchises=10)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('product-list'), {'page_size': 20})
+        self.assertEqual(len(response.json()['results']), 20)
+
+
+
+class KeysetPaginationTests(TestCase):
+    """The list endpoints page through every row exactly once by following the next links"""
+
+    def setUp(self):
+        self.client = APIClient()
+        # Same-named publishers and products sharing a release date exercise the tie-breaking columns
+        self.publishers = Publisher.objects.bulk_create([
+            Publisher(name='Publisher', website='https://example.com', image='') for _ in range(5)
+        ] + [Publisher(name='Another publisher', website='https://example.com', image='')])
+        franchises = Franchise.objects.bulk_create([
+            Franchise(title=f'Franchise {index:02d}', description='', image='') for index in range(11)
+        ])
+        Product.objects.bulk_create([
+            Product(
+                isbn=f'978-3-{index:04d}-{volume:04d}-0',
+                title=f'{franchise.title}, Band {volume:02d}',
+                description='',
+                image='',
+                link_to_provider='',
+                release_date=date(2024, 1, 1 + volume % 3),
+                franchise=franchise,
+                publisher=self.publishers[index % len(self.publishers)],
+            )
+            for index, franchise in enumerate(franchises)
+            for volume in range(4)
+        ])
+
+    def walk(self, name, key, page_size):
+        """Follow the next links of a list endpoint, returning the key of every row in page order"""
+        rows = []
+        response = self.client.get(reverse(name), {'page_size': page_size})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['results']), page_size)
+            rows.extend(key(row) for row in page['results'])
+            if page['next'] is None:
+                return rows
+            response = self.client.get(page['next'])
+
+    def test_products_are_walked_in_release_date_and_isbn_order(self):
+        rows = self.walk('product-list', lambda product: product['isbn'], page_size=5)
+        expected = list(Product.objects.order_by('release_date', 'isbn').values_list('isbn', flat=True))
+        self.assertEqual(len(expected), 44)
+        self.assertEqual(rows, expected)
+
+    def test_franchises_are_walked_in_title_order(self):
+        rows = self.walk('franchise-list', lambda franchise: franchise['title'], page_size=4)
+        self.assertEqual(rows, [f'Franchise {index:02d}' for index in range(11)])
+
+    def test_same_named_publishers_are_walked_once_each(self):
+        rows = self.walk('publisher-list', lambda publisher: publisher['id'], page_size=2)
+        self.assertEqual(len(rows), len(set(rows)))
+        self.assertEqual(rows, [str(id) for id in Publisher.objects.order_by('name', 'id').values_list('id', flat=True)])
+
+    def test_full_dump_returns_the_plain_list(self):
+        response = self.client.get(reverse('product-list'), {'all': 'true', 'page_size': 5})
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual(len(response.json()), 44)
+
+    def test_invalid_cursor_is_not_found(self):
+        for cursor in ('not base64!', 'WyJ4Il0', 'eyJhIjogMX0', 'WyJub3QgYSBkYXRlIiwgIngiXQ'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse('product-list'), {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class ScraperTestCase(SimpleTestCase):
+    """Keeps the scrapers' cache, crawl frontier and metrics in a temporary directory and their output quiet"""
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.object(BaseScraper, 'CACHE_DIR', Path(cache_dir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def fixture(name):
+        return FixtureArchive.load(FIXTURE_DIR / f'{name.lower()}.zip')
+
+    def scrape(self, scraper, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return scraper.scrape_products(**kwargs)
+
+
+class FixtureReplayTests(ScraperTestCase):
+    """Every registered scraper against its recorded pages (scraper_fixtures/<publisher>.zip), offline"""
+
+    def test_scrapers_find_every_product_of_their_fixtures(self):
+        for name, scraper_cls in load_scrapers().items():
+            archive = self.fixture(name)
+            for engine in ('threads', 'asyncio'):
+                with self.subTest(publisher=name, engine=engine), ReplayServer(archive) as server:
+                    scraper = scraper_cls(rate_limit=0, base_url=server.url, use_cache=False)
+                    franchises = self.scrape(scraper, engine=engine)
+                    products = [product for volumes in franchises.values() for product in volumes]
+
+                    # Every product page with an ISBN, found from the listing pages alone
+                    expected = sum('itemprop="isbn"' in page for page in archive.pages.values())
+                    self.assertGreater(expected, 0)
+                    self.assertEqual(len(products), expected)
+                    self.assertEqual(len({product['isbn'] for product in products}), expected)
+                    for product in products:
+                        self.assertTrue(product['title'] and product['description'] and product['image'])
+                        self.assertRegex(product['release_date'], r'^\d{2}\.\d{2}\.\d{4}$')
+                        self.assertIsNotNone(product['type'])
+                        self.assertTrue(product['link'].startswith(server.url))
+
+
+class SoupStrainerTests(ScraperTestCase):
+    """Parsing only the regions a scraper reads gives the same result as parsing the whole page"""
+
+    def test_strained_parse_equals_full_parse(self):
+        for name, scraper_cls in load_scrapers().items():
+            archive = self.fixture(name)
+            strained = scraper_cls(rate_limit=0, use_cache=False)
+            full = scraper_cls(rate_limit=0, use_cache=False)
+            full.LISTING_PARSE_ONLY = full.DETAIL_PARSE_ONLY = None
+
+            listing = archive.get(FixtureArchive.key(strained._listing_url(1)))
+            links = strained._parse_product_links(listing)
+            with self.subTest(publisher=name, page='listing'):
+                self.assertTrue(links)
+                self.assertEqual(links, full._parse_product_links(listing))
+
+            for link in links:
+                content = archive.get(FixtureArchive.key(link))
+                with self.subTest(publisher=name, page=link), redirect_stdout(io.StringIO()):
+                    product = strained._parse_product_details_soup(link, content)
+                    self.assertEqual(product, full._parse_product_details_soup(link, content))
+                    if product:
+                        self.assertIsNotNone(product.release_date)
+                        self.assertIsNotNone(product.product_type)
+
+
+class ParsePathTests(ScraperTestCase):
+    """The structured data fast path and the soup parser read the same product from a page"""
+
+    def test_fast_path_equals_soup_parser(self):
+        for name, scraper_cls in load_scrapers().items():
+            archive = self.fixture(name)
+            scraper = scraper_cls(rate_limit=0, use_cache=False)
+            product_pages = [
+                (key, page) for key, page in archive.pages.items() if scraper.PRODUCT_URL_PATTERN.search(key)
+            ]
+            self.assertTrue(product_pages)
+            for key, page in product_pages:
+                url = scraper.BASE_URL + key
+                with self.subTest(publisher=name, page=key), redirect_stdout(io.StringIO()):
+                    soup_product = scraper._parse_product_details_soup(url, page)
+                    fast_product = scraper._parse_structured_data(url, extract_structured_data(page))
+                    if 'itemprop="isbn"' in page:
+                        self.assertIsNotNone(fast_product)
+                        self.assertEqual(fast_product, soup_product)
+                    else:
+                        self.assertIsNone(fast_product)
+
+
+class PolitenessTests(ScraperTestCase):
+    """Both engines pace their requests by the token bucket and reuse pooled connections"""
+
+    RATE = 20.0
+
+    def run_engine(self, engine, **kwargs):
+        """Scrape the first listing page of the Altraverse fixture, returning the products and the server's request log"""
+        with ReplayServer(self.fixture('Altraverse')) as server:
+            scraper = AltraverseScraper(
+                base_url=server.url, requests_per_second=self.RATE, burst=1, use_cache=False, **kwargs
+            )
+            franchises = self.scrape(scraper, engine=engine, max_pages=1)
+        # Each run has its own server address, compare products by path
+        products = {
+            product['isbn']: (franchise, {key: value.replace(server.url, '') for key, value in product.items()})
+            for franchise, volumes in franchises.items() for product in volumes
+        }
+        return products, server.log
+
+    def assert_spaced(self, log):
+        # One listing page and its product pages
+        self.assertEqual(len(log), 13)
+        arrivals = [arrived for arrived, _, _ in log]
+        # With a burst of one the bucket hands out a token every 1 / RATE seconds
+        self.assertGreaterEqual(arrivals[-1] - arrivals[0], (len(arrivals) - 1) / self.RATE - 0.01)
+        # Requests can arrive a little earlier or later than their token was taken, but never in a burst
+        gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+        self.assertGreaterEqual(min(gaps), 0.5 / self.RATE)
+
+    def test_engines_return_the_same_products(self):
+        threads, _ = self.run_engine('threads', max_workers=2)
+        asyncio_, _ = self.run_engine('asyncio')
+        self.assertTrue(threads)
+        self.assertEqual(threads, asyncio_)
+
+    def test_asyncio_engine_spaces_requests_and_reuses_connections(self):
+        with mock.patch.object(AltraverseScraper, 'MAX_CONNECTIONS_PER_HOST', 2):
+            _, log = self.run_engine('asyncio')
+        self.assert_spaced(log)
+        self.assertLessEqual(len({port for _, port, _ in log}), 2)
+
+    def test_thread_engine_spaces_requests_and_reuses_connections(self):
+        _, log = self.run_engine('threads', max_workers=2)
+        self.assert_spaced(log)
+        # One pooled connection per detail worker and one for the listing crawler
+        self.assertLessEqual(len({port for _, port, _ in log}), 3)
+
+
+class ListingCrawlTests(ScraperTestCase):
+    """The listing crawl tells a page that could not be fetched from the end of the listing"""
+
+    def test_failed_listing_page_is_retried_by_the_resumed_run(self):
+        archive = self.fixture('Altraverse')
+        with ReplayServer(archive) as server:
+            scraper = AltraverseScraper(rate_limit=0, base_url=server.url, use_cache=False)
+            second_page = FixtureArchive.key(scraper._listing_url(2))
+            content = archive.pages.pop(second_page)
+            first_run = self.scrape(scraper)
+            # The listing cursor stays on page 1 instead of the listing being marked as walked
+            self.assertEqual(scraper.frontier.listing_state(), (1, False))
+
+            archive.pages[second_page] = content
+            second_run = self.scrape(scraper, resume=True)
+            self.assertEqual(scraper.frontier.listing_state(), (2, True))
+
+        isbns = [product['isbn'] for franchises in (first_run, second_run)
+                 for volumes in franchises.values() for product in volumes]
+        self.assertEqual(len(isbns), len(set(isbns)))
+        self.assertEqual(len(isbns), sum('itemprop="isbn"' in page for page in archive.pages.values()))
+
+    def test_without_max_pages_every_stated_page_is_walked(self):
+        scraper = AltraverseScraper(rate_limit=0, use_cache=False)
+        queued = []
+        with mock.patch.object(scraper, '_get_listing', return_value=(['/1/product'], 8)), \
+                mock.patch.object(scraper, '_get_product_links', side_effect=lambda page: [f'/{page}/product']), \
+                mock.patch.object(scraper, '_queue_url', side_effect=lambda frontier, url, stop: queued.append(url) or True):
+            for max_pages, expected in ((None, 8), (5, 5), (20, 8)):
+                with self.subTest(max_pages=max_pages):
+                    queued.clear()
+                    scraper._queue_listing_pages(None, None, 1, max_pages, False, None)
+                    self.assertEqual(queued, [f'/{page}/product' for page in range(1, expected + 1)])
+
+    def test_monthly_update_passes_max_pages_to_the_scraper(self):
+        with mock.patch.object(MonthlyUpdateCommand, 'update_publisher') as update_publisher:
+            for argv, expected in (([], None), (['--max-pages', '3'], 3)):
+                with self.subTest(argv=argv):
+                    call_command('monthly_update', '--publishers', 'Altraverse', '--skip-covers', *argv,
+                                 stdout=io.StringIO())
+                    self.assertEqual(update_publisher.call_args.args[-1], expected)
+
+class SitemapDiscoveryTests(ScraperTestCase):
+    """Sitemap discovery of the thread engine against the recorded robots.txt and sitemaps"""
+
+    def test_only_product_pages_are_fetched_through_the_fetch_path(self):
+        archive = self.fixture('Altraverse')
+        with ReplayServer(archive) as server:
+            scraper = AltraverseScraper(rate_limit=0, base_url=server.url, use_cache=False)
+            scraper.recorder = FixtureArchive(server.url)
+            franchises = self.scrape(scraper, sitemap=True)
+
+        requested = [key for _, _, key in server.log]
+        self.assertIn('/web/sitemap/shop-1/sitemap-1.xml', requested)
+        # Category and CMS pages listed by the sitemap are skipped
+        self.assertNotIn('/impressum', requested)
+        self.assertNotIn('/manga/', requested)
+        self.assertEqual(sum(len(volumes) for volumes in franchises.values()), 23)
+
+        # Sitemaps count as requests and are recorded like any other page
+        self.assertEqual(sum(host.latency.count for host in scraper.metrics.hosts.values()), len(requested))
+        self.assertIn('/sitemap_index.xml', scraper.recorder.pages)
+
+    def test_watermark_only_advances_when_every_product_page_was_fetched(self):
+        archive = self.fixture('Altraverse')
+        with ReplayServer(archive) as server:
+            scraper = AltraverseScraper(rate_limit=0, base_url=server.url, use_cache=False)
+            product_page = next(key for key in archive.pages if AltraverseScraper.PRODUCT_URL_PATTERN.search(key))
+            content = archive.pages.pop(product_page)
+            self.scrape(scraper, sitemap=True)
+            self.assertIsNone(scraper.frontier.last_discovery())
+
+            archive.pages[product_page] = content
+            self.scrape(scraper, sitemap=True)
+            self.assertIsNotNone(scraper.frontier.last_discovery())
+
+
+class CoverDownloadTests(SimpleTestCase):
+    """download_covers reads images in chunks and gives up on oversized ones"""
+
+    def test_oversized_cover_is_rejected(self):
+        archive = FixtureArchive('http://covers.invalid', {'/small.jpg': 'x' * 100, '/large.jpg': 'x' * 5000})
+        command = DownloadCoversCommand()
+        command.MAX_COVER_BYTES, command.CHUNK_BYTES = 1000, 256
+        with ReplayServer(archive) as server:
+            session = BaseScraper._create_session()
+            self.assertEqual(command.download(session, f'{server.url}/small.jpg', 0), b'x' * 100)
+            with self.assertRaisesMessage(ValueError, 'size limit'):
+                command.download(session, f'{server.url}/large.jpg', 0)
+
+
+class CoverStorageTests(TestCase):
+    """Covers are stored once per content, with a thumbnail per size served as immutable files"""
+
+    def setUp(self):
+        cover_root = tempfile.TemporaryDirectory()
+        self.addCleanup(cover_root.cleanup)
+        overrider = override_settings(COVER_ROOT=cover_root.name)
+        overrider.enable()
+        self.addCleanup(overrider.disable)
+        self.client = APIClient()
+
+    @staticmethod
+    def image(color, size=(800, 1200)):
+        content = io.BytesIO()
+        Image.new('RGB', size, color).save(content, 'PNG')
+        return content.getvalue()
+
+    def test_identical_content_is_stored_once(self):
+        cover = store_cover(self.image('red'))
+        with mock.patch('api.covers.Image.open') as image_open:
+            self.assertEqual(store_cover(self.image('red')), cover)
+        # Neither decoded nor resized again
+        image_open.assert_not_called()
+        self.assertNotEqual(store_cover(self.image('blue')), cover)
+        self.assertEqual(CoverImage.objects.count(), 2)
+
+    def test_a_thumbnail_is_written_for_every_size(self):
+        cover = store_cover(self.image('red', (800, 1000)))
+        self.assertEqual((cover.width, cover.height), (800, 1000))
+        for size, (max_width, max_height) in settings.COVER_THUMBNAIL_SIZES.items():
+            with self.subTest(size=size), Image.open(thumbnail_path(cover.digest, size)) as thumbnail:
+                self.assertEqual(thumbnail.format, 'JPEG')
+                # Scaled down to fit the bounds without distorting the cover
+                self.assertLessEqual(thumbnail.width, max_width)
+                self.assertLessEqual(thumbnail.height, max_height)
+                self.assertTrue(thumbnail.width == max_width or thumbnail.height == max_height)
+                self.assertAlmostEqual(thumbnail.width / thumbnail.height, 800 / 1000, places=2)
+
+    def test_thumbnails_are_served_with_cache_validators(self):
+        cover = store_cover(self.image('red'))
+        url = reverse('cover-thumbnail', args=[cover.digest, 'small'])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(b''.join(response.streaming_content), thumbnail_path(cover.digest, 'small').read_bytes())
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+        for digest, size in ((cover.digest, 'huge'), ('0' * 64, 'small'), ('not-a-digest', 'small')):
+            with self.subTest(digest=digest, size=size):
+                self.assertEqual(self.client.get(reverse('cover-thumbnail', args=[digest, size])).status_code, 404)
+
+
+class AdaptiveLimitTests(SimpleTestCase):
+    """Coroutines waiting for a slot of the per-host concurrency limit"""
+
+    def test_waiting_coroutines_get_slots_in_arrival_order(self):
+        async def scenario():
+            limit = AdaptiveLimit(1, 1)
+            held = await limit.acquire_async()
+            order = []
+
+            async def request(index):
+                ticket = await limit.acquire_async()
+                order.append(index)
+                await asyncio.sleep(0)
+                limit.release(ticket, None, False)
+
+            waiters = [asyncio.create_task(request(index)) for index in range(5)]
+            await asyncio.sleep(0)
+            # The third waiter gives up, its turn must not leak a slot
+            waiters[2].cancel()
+            limit.release(held, None, False)
+            # A coroutine arriving after the slot was freed queues behind the ones already waiting
+            waiters.append(asyncio.create_task(request(5)))
+            await asyncio.gather(*waiters, return_exceptions=True)
+            return order, limit.in_flight
+
+        self.assertEqual(asyncio.run(scenario()), ([0, 1, 3, 4, 5], 0))
+
+    def test_asyncio_engine_bounds_product_pages_in_flight(self):
+        running = peak = 0
+        extract = AltraverseScraper._extract_product_details_async
+
+        async def counted(scraper, session, url):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            try:
+                return await extract(scraper, session, url)
+            finally:
+                running -= 1
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.object(BaseScraper, 'CACHE_DIR', Path(cache_dir)), \
+                mock.patch.multiple(AltraverseScraper, MAX_IN_FLIGHT=3, _extract_product_details_async=counted), \
+                ReplayServer(ScraperTestCase.fixture('Altraverse'), latency=0.01) as server:
+            scraper = AltraverseScraper(rate_limit=0, base_url=server.url, use_cache=False)
+            with redirect_stdout(io.StringIO()):
+                franchises = scraper.scrape_products(engine='asyncio')
+        self.assertEqual(sum(len(volumes) for volumes in franchises.values()), 23)
+        self.assertEqual(peak, 3)
+
+
+class ProductWriterTests(TestCase):
+    """monthly_update's batch upsert of scraped products"""
+
+    def setUp(self):
+        self.command = MonthlyUpdateCommand(stdout=io.StringIO())
+        self.publisher = Publisher.objects.create(name='Altraverse', website='https://altraverse.de', image='')
+
+    @staticmethod
+    def product(isbn, franchise='Gamers!', title=None, **fields):
+        return ProductInfo(**{
+            'title': title or f'{franchise}, Band {isbn[-3]}',
+            'franchise': franchise,
+            'isbn': isbn,
+            'description': 'Keita Amano liebt Videospiele.',
+            'image_url': f'https://altraverse.de/media/{isbn}.jpg',
+            'release_date': date(2025, 3, 1),
+            'product_type': 'MANGA',
+            'url': f'https://altraverse.de/manga/{isbn}',
+            **fields,
+        })
+
+    def test_counts_new_changed_and_unchanged_products(self):
+        first = [self.product('978-3-9635-0101-0'), self.product('978-3-9635-0102-7'), self.product('978-3-9635-0103-4')]
+        self.assertEqual(self.command.writeToDatabase(first, self.publisher), Counter(new=3))
+
+        second = [
+            first[0],
+            self.product('978-3-9635-0102-7', description='Neue Beschreibung'),
+            self.product('978-3-9635-0104-1'),
+        ]
+        self.assertEqual(
+            self.command.writeToDatabase(second, self.publisher),
+            Counter(new=1, changed=1, unchanged=1),
+        )
+        self.assertEqual(Product.objects.count(), 4)
+        self.assertEqual(Product.objects.get(isbn='978-3-9635-0102-7').description, 'Neue Beschreibung')
+
+    def test_products_of_a_franchise_share_one_row(self):
+        existing = Franchise.objects.create(title='Gamers!', description='Stored before', image='', is_followed=True)
+        self.command.writeToDatabase([
+            self.product('978-3-9635-0101-0'),
+            self.product('978-3-9635-0102-7'),
+            self.product('978-3-9635-0103-4', franchise='Kaiju No. 8'),
+            self.product('978-3-9635-0104-1', franchise='Kaiju No. 8'),
+        ], self.publisher)
+
+        self.assertEqual(Franchise.objects.count(), 2)
+        self.assertEqual(existing.products.count(), 2)
+        self.assertEqual(Franchise.objects.get(title='Kaiju No. 8').products.count(), 2)
+        existing.refresh_from_db()
+        self.assertTrue(existing.is_followed)
+
+    def test_bulk_load_counts_products_and_reuses_franchises(self):
+        existing = Franchise.objects.create(title='Gamers!', description='Stored before', image='')
+        first = [
+            self.product('978-3-9635-0101-0'),
+            self.product('978-3-9635-0102-7'),
+            self.product('978-3-9635-0103-4', franchise='Kaiju No. 8'),
+            self.product('978-3-9635-0104-1', franchise='Kaiju No. 8'),
+        ]
+        self.assertEqual(self.command.bulk_load(first, self.publisher), Counter(new=4, changed=0, unchanged=0))
+        self.assertEqual(Franchise.objects.count(), 2)
+        self.assertEqual(existing.products.count(), 2)
+
+        second = [*first[:3], self.product('978-3-9635-0104-1', franchise='Kaiju No. 8', title='Kaiju No. 8, Band 04')]
+        self.assertEqual(self.command.bulk_load(second, self.publisher), Counter(new=0, changed=1, unchanged=3))
+        self.assertEqual(Product.objects.get(isbn='978-3-9635-0104-1').title, 'Kaiju No. 8, Band 04')
+
+        # Both writers fingerprint products alike, so switching between them rewrites nothing
+        self.assertEqual(self.command.writeToDatabase(second, self.publisher), Counter(unchanged=4))
+
+    @skipUnless(connection.vendor == 'postgresql', 'relies on the test transaction rolling back a schema change')
+    def test_duplicate_franchises_are_merged(self):
+        # Titles as they were before they became unique
+        non_unique = CharField(max_length=100)
+        non_unique.set_attributes_from_name('title')
+        with connection.schema_editor() as editor:
+            editor.alter_field(Franchise, Franchise._meta.get_field('title'), non_unique)
+        kept, duplicate = Franchise.objects.bulk_create([
+            Franchise(title='Gamers!', description='', image='', is_followed=True),
+            Franchise(title='Gamers!', description='', image=''),
+        ])
+        self.command.writeToDatabase([self.product('978-3-9635-0101-0')], self.publisher)
+        Product.objects.filter(isbn='978-3-9635-0101-0').update(franchise=duplicate)
+
+        call_command('merge_duplicate_franchises', stdout=io.StringIO())
+        self.assertEqual(list(Franchise.objects.values_list('id', flat=True)), [kept.id])
+        self.assertEqual(Product.objects.get(isbn='978-3-9635-0101-0').franchise_id, kept.id)
+
+
+class ClearDatabaseTests(TransactionTestCase):
+    """
+    clear_database empties the targeted tables and leaves all others alone.
+    PostgreSQL refuses to TRUNCATE rows written earlier in the same transaction, so the rows are committed
+    """
+
+    def setUp(self):
+        self.superuser = User.objects.create_superuser('admin', password='admin')
+        self.user = User.objects.create_user('reader', password='reader')
+        self.group = Group.objects.create(name='Readers')
+        self.user.groups.add(self.group)
+        cover = CoverImage.objects.create(digest='0' * 64, width=160, height=240)
+        publisher = Publisher.objects.create(name='Altraverse', website='https://altraverse.de', image='')
+        franchise = Franchise.objects.create(title='Gamers!', description='', image='', cover=cover)
+        Product.objects.create(
+            isbn='978-3-9635-0101-0', title='Gamers!, Band 01', description='', image='', link_to_provider='',
+            release_date=date(2024, 1, 1), franchise=franchise, publisher=publisher, cover=cover,
+        )
+
+    def test_app_target_only_clears_its_tables(self):
+        permissions = Permission.objects.count()
+        content_types = ContentType.objects.count()
+        call_command('clear_database', 'api', stdout=io.StringIO())
+
+        for model in (CoverImage, Publisher, Franchise, Product):
+            with self.subTest(model=model.__name__):
+                self.assertFalse(model.objects.exists())
+        self.assertEqual(set(User.objects.values_list('username', flat=True)), {'admin', 'reader'})
+        self.assertEqual(list(self.user.groups.all()), [self.group])
+        self.assertEqual(Permission.objects.count(), permissions)
+        self.assertEqual(ContentType.objects.count(), content_types)
+
+    def test_superusers_are_preserved(self):
+        call_command('clear_database', 'api', 'auth.User', '--preserve-superuser', stdout=io.StringIO())
+
+        self.assertEqual(list(User.objects.all()), [self.superuser])
+        self.assertTrue(User.objects.get().check_password('admin'))
+        self.assertFalse(Product.objects.exists())
+        self.assertEqual(list(Group.objects.all()), [self.group])
+
+        call_command('clear_database', 'auth.User', stdout=io.StringIO())
+        self.assertFalse(User.objects.exists())
+
+
+class GenerateCatalogTests(TransactionTestCase):
+    """generate_catalog builds the same catalog for the same seed, with the requested shares"""
+
+    options = ['--franchises', '200', '--products', '400', '--publishers', '2', '--batch-size', '64',
+               '--followed-ratio', '0.1', '--owned-ratio', '0.3']
+
+    @staticmethod
+    def catalog():
+        product_fields = [field.attname for field in Product._meta.concrete_fields if field.name != 'updated_at']
+        return (
+            list(Publisher.objects.order_by('id').values_list()),
+            list(Franchise.objects.order_by('id').values_list()),
+            list(Product.objects.order_by('isbn').values_list(*product_fields)),
+        )
+
+    def test_same_seed_generates_the_same_catalog(self):
+        call_command('generate_catalog', *self.options, '--seed', '7', stdout=io.StringIO())
+        first = self.catalog()
+        call_command('generate_catalog', *self.options, '--seed', '7', '--clear', stdout=io.StringIO())
+        self.assertEqual(self.catalog(), first)
+
+        call_command('generate_catalog', *self.options, '--seed', '8', '--clear', stdout=io.StringIO())
+        self.assertNotEqual(self.catalog(), first)
+
+    def test_followed_and_owned_shares(self):
+        call_command('generate_catalog', *self.options, stdout=io.StringIO())
+
+        self.assertEqual(Franchise.objects.count(), 200)
+        self.assertEqual(Product.objects.count(), 400)
+        self.assertFalse(Franchise.objects.filter(products__isnull=True).exists())
+        # Franchises are followed by chance, products are owned by exact count
+        self.assertAlmostEqual(Franchise.objects.filter(is_followed=True).count() / 200, 0.1, delta=0.05)
+        self.assertEqual(Product.objects.filter(is_owned=True).count(), round(0.3 * 400))
+        # What the followed franchises leave of the owned share is spread over the others
+        self.assertTrue(Product.objects.filter(is_owned=True, franchise__is_followed=False).exists())
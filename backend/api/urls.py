@@ -16,6 +16,9 @@ urlpatterns = [
     path("products/<str:product_id>/toggle-owned/", views.ToggleProductOwned.as_view(), name="toggle-product-owned"),
     path("franchises/<uuid:franchise_id>/follow/", views.ToggleFranchiseFollow.as_view(), name="toggle-franchise-follow"),
 
+    # Cover thumbnails downloaded by the download_covers command
+    path("covers/<str:digest>/<str:size>.jpg", views.CoverThumbnail.as_view(), name="cover-thumbnail"),
+
     # Utility routes
     path('logs/', views.LogEntryView.as_view(), name='app-logs'),
 ]
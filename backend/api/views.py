@@ -1,5 +1,8 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.models import User
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.db.models import Prefetch
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -10,6 +13,22 @@ logger = logging.getLogger(__name__)
 
 from .serializers import UserSerializer, ProductSerializer, FranchiseSerializer, PublisherSerializer
 from .models import Franchise, Product, Publisher
+from .covers import DIGEST_PATTERN, thumbnail_path
+from .pagination import ProductPagination, FranchisePagination, PublisherPagination
+
+
+def franchises_with_products():
+    """Franchises with the ISBNs of their products, fetched in one query for all of them"""
+    return Franchise.objects.prefetch_related(
+        Prefetch('products', queryset=Product.objects.only('isbn', 'franchise_id'))
+    )
+
+
+def publishers_with_products():
+    """Publishers with the ISBNs of their products, fetched in one query for all of them"""
+    return Publisher.objects.prefetch_related(
+        Prefetch('products', queryset=Product.objects.only('isbn', 'publisher_id'))
+    )
 
 
 """
@@ -34,7 +53,7 @@ class FranchiseListCreate(generics.ListCreateAPIView):
     permission_classes = [IsAdminUser]
 
     def get_queryset(self):
-        return Franchise.objects.all()
+        return franchises_with_products()
 
     def perform_create(self, serializer):
         if serializer.is_valid():
@@ -48,7 +67,7 @@ class PublisherListCreate(generics.ListCreateAPIView):
     permission_classes = [IsAdminUser]
 
     def get_queryset(self):
-        return Publisher.objects.all()
+        return publishers_with_products()
 
     def perform_create(self, serializer):
         if serializer.is_valid():
@@ -63,6 +82,7 @@ Public views
 class ProductList(generics.ListAPIView):
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
+    pagination_class = ProductPagination
 
     def get_queryset(self):
         return Product.objects.all()
@@ -71,17 +91,19 @@ class ProductList(generics.ListAPIView):
 class FranchiseList(generics.ListAPIView):
     serializer_class = FranchiseSerializer
     permission_classes = [AllowAny]
+    pagination_class = FranchisePagination
 
     def get_queryset(self):
-        return Franchise.objects.all()
+        return franchises_with_products()
 
 
 class PublisherList(generics.ListAPIView):
     serializer_class = PublisherSerializer
     permission_classes = [AllowAny]
+    pagination_class = PublisherPagination
 
     def get_queryset(self):
-        return Publisher.objects.all()
+        return publishers_with_products()
 
 class LogEntryView(APIView):
     permission_classes = [AllowAny]  # Adjust according to your security needs
@@ -115,6 +137,30 @@ class LogEntryView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class CoverThumbnail(APIView):
+    """
+    Serve a pre-generated cover thumbnail.
+    Thumbnails are addressed by the hash of their cover, so they can be cached forever.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, digest, size):
+        if not DIGEST_PATTERN.fullmatch(digest) or size not in settings.COVER_THUMBNAIL_SIZES:
+            raise Http404
+        path = thumbnail_path(digest, size)
+        if not path.exists():
+            raise Http404
+
+        etag = f'"{digest}-{size}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'), content_type='image/jpeg')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+
+
 class ToggleProductOwned(APIView):
     """
     Toggle product ownership state (global, not user-specific)
@@ -136,6 +136,14 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Cover images downloaded by download_covers, with their pre-generated thumbnails
+COVER_ROOT = Path(os.getenv("COVER_ROOT", BASE_DIR / "covers"))
+# Thumbnail name -> maximum width and height in pixels
+COVER_THUMBNAIL_SIZES = {
+    "small": (160, 240),
+    "medium": (320, 480),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
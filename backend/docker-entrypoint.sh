@@ -10,6 +10,10 @@ done
 
 echo "Database is ready!"
 
+# Franchise titles are unique, merge duplicates left by earlier versions before the constraint is applied
+echo "Merging duplicate franchises..."
+python manage.py merge_duplicate_franchises
+
 # Run migrations
 echo "Running makemigrations..."
 python manage.py makemigrations --noinput
@@ -32,7 +32,7 @@ function FranchiseCard({franchise, onClick}: FranchiseCardProps) {
             title={franchise.title}
             onClick={onClick}
             className='w-43 sm:w-70 md:w-60 lg:w-60 p-4'
-            imageUrl={franchise.image}
+            imageUrl={franchise.thumbnails?.medium ?? franchise.image}
             imageAlt={franchise.title}
         >
             <div className="flex justify-center mt-2">
@@ -18,7 +18,7 @@ function ProductCard({product, onClick}: ProductCardProps) {
       title={product.title}
       onClick={onClick}
       className='w-43 sm:w-70 md:w-60 lg:w-60 p-4'
-      imageUrl={product.image}
+      imageUrl={product.thumbnails?.medium ?? product.image}
       imageAlt={product.title}
       topRightContent={
         isOwned ? (
@@ -3,6 +3,7 @@ export default interface Franchise {
     title: string;
     description: string;
     image: string;
+    thumbnails?: Record<'small' | 'medium', string> | null; // local cover thumbnails, null until downloaded
     products: string[]; // array of product ISBNs
     is_followed: boolean;
 }
@@ -3,6 +3,7 @@ interface Product {
     title: string;
     description: string;
     image: string;
+    thumbnails?: Record<'small' | 'medium', string> | null; // local cover thumbnails, null until downloaded
     release_date: string;
     type: string;
     link_to_provider: string;
@@ -16,7 +16,7 @@ const initialState: FranchiseState = {
 };
 
 export const fetchFranchises = createAsyncThunk('franchises/fetchFranchises', async () => {
-    const response = await api.get('/api/franchises/list/');
+    const response = await api.get('/api/franchises/list/', { params: { all: true } });
     return response.data;
 });
 
@@ -18,7 +18,7 @@ const initialState: ProductState = {
 export const fetchProducts = createAsyncThunk(
     'products/fetchProducts',
     async () => {
-        const response = await api.get('/api/products/list/');
+        const response = await api.get('/api/products/list/', { params: { all: true } });
         const { data } = response;
         // Convert array to object with ISBN as key
         return data.reduce((acc: { [key: string]: Product }, product: Product) => {